@@ -0,0 +1,124 @@
+"""Audio metadata probing shared by the Streamlit app and the watch-folder service"""
+import logging
+import subprocess
+from datetime import datetime
+from typing import Dict
+
+from mutagen import File as MutagenFile
+
+logger = logging.getLogger("frontend")
+
+# Fields that describe one upload rather than the audio content; the rest can be shared by content hash
+UPLOAD_FIELDS = ("name", "format", "upload_time")
+
+
+def upload_fields(name: str) -> Dict:
+    """Per-upload part of the file info"""
+    return {
+        "name": name,
+        "format": name.split('.')[-1].upper(),
+        "upload_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }
+
+
+def audio_fields(file_info: Dict) -> Dict:
+    """Content-derived part of the file info, safe to share between uploads of the same audio"""
+    return {key: value for key, value in file_info.items() if key not in UPLOAD_FIELDS}
+
+
+def probe_audio_file(path: str, name: str, size_bytes: int) -> Dict:
+    """Extract comprehensive file information from an audio file on disk"""
+    try:
+        # Get audio metadata using mutagen
+        audio_file = MutagenFile(path)
+        duration = 0
+        bitrate = 0
+        
+        if audio_file is not None and hasattr(audio_file, 'info'):
+            # Handle different audio formats
+            info = audio_file.info
+            
+            # Get duration
+            if hasattr(info, 'length'):
+                duration = info.length
+            elif hasattr(info, 'duration'):
+                duration = info.duration
+            
+            # Get bitrate
+            if hasattr(info, 'bitrate'):
+                bitrate = info.bitrate
+            elif hasattr(info, 'total_bitrate'):
+                bitrate = info.total_bitrate
+            
+            # For MP4/M4A files, try alternative methods
+            if duration == 0 and name.lower().endswith(('.m4a', '.mp4', '.aac')):
+                try:
+                    from mutagen.mp4 import MP4
+                    mp4_file = MP4(path)
+                    if mp4_file.info:
+                        duration = mp4_file.info.length
+                        bitrate = mp4_file.info.bitrate
+                except:
+                    pass
+        
+        # If still no duration, try ffprobe as fallback
+        if duration == 0:
+            try:
+                # Try using ffprobe to get accurate metadata
+                result = subprocess.run([
+                    'ffprobe', '-v', 'quiet', '-show_entries', 
+                    'format=duration,bit_rate', '-of', 'csv=p=0', path
+                ], capture_output=True, text=True, timeout=30)
+                
+                if result.returncode == 0:
+                    lines = result.stdout.strip().split('\n')
+                    if len(lines) > 0:
+                        parts = lines[0].split(',')
+                        if len(parts) >= 1 and parts[0]:
+                            duration = float(parts[0])
+                        if len(parts) >= 2 and parts[1]:
+                            bitrate = float(parts[1])
+                        logger.info(f"Successfully extracted metadata using ffprobe for {name}")
+            except Exception as ffprobe_error:
+                logger.warning(f"ffprobe failed: {ffprobe_error}")
+        
+        # If still no duration, estimate based on file size and typical bitrates
+        if duration == 0:
+            file_size_mb = size_bytes / (1024 * 1024)
+            # Estimate duration based on typical audio bitrates (128-320 kbps average)
+            estimated_bitrate = 192  # kbps average
+            duration = (file_size_mb * 8 * 1024) / estimated_bitrate  # Convert MB to seconds
+            bitrate = estimated_bitrate * 1000  # Convert to bps
+            logger.warning(f"Could not extract metadata for {name}, using size-based estimates")
+        
+        file_size = size_bytes
+        
+        return {
+            "size_bytes": file_size,
+            "size_mb": file_size / (1024 * 1024),
+            "duration_seconds": duration,
+            "duration_minutes": duration / 60 if duration > 0 else 0,
+            "bitrate_kbps": bitrate // 1000 if bitrate > 0 else 0,
+            "estimated_words": int(duration * 2.5) if duration > 0 else 0,  # ~150 words per minute / 60 seconds
+            **upload_fields(name)
+        }
+        
+    except Exception as e:
+        logger.error(f"Error getting file info: {e}")
+        
+        # Fallback with size-based estimation
+        file_size = size_bytes
+        file_size_mb = file_size / (1024 * 1024)
+        
+        # Rough estimation for audio files based on typical compression
+        estimated_duration = (file_size_mb * 8 * 1024) / 192  # 192 kbps average
+        
+        return {
+            "size_bytes": file_size,
+            "size_mb": file_size_mb,
+            "duration_seconds": estimated_duration,
+            "duration_minutes": estimated_duration / 60,
+            "bitrate_kbps": 192,  # Estimated average
+            "estimated_words": int(estimated_duration * 2.5),
+            **upload_fields(name)
+        }
@@ -0,0 +1,354 @@
+"""HTTP client for the transcription backend"""
+import hashlib
+import io
+import logging
+import os
+import socket
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.filepost import encode_multipart_formdata
+
+from shared_store import get_store
+
+logger = logging.getLogger("frontend")
+
+BACKEND_URL = os.getenv("BACKEND_URL", "http://app:8000")
+TRANSCRIBE_TIMEOUT = int(os.getenv("TRANSCRIBE_TIMEOUT", "7200"))
+UPLOAD_BLOCK_SIZE = 256 * 1024
+RESUMABLE_UPLOADS = os.getenv("RESUMABLE_UPLOADS", "1") == "1"
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(8 * 1024 * 1024)))
+UPLOAD_MAX_RETRIES = int(os.getenv("UPLOAD_MAX_RETRIES", "8"))
+UPLOAD_TTL = 24 * 3600
+
+
+class BackendError(Exception):
+    """Non-200 response from the backend"""
+
+    def __init__(self, status_code: int, text: str):
+        super().__init__(f"API Error: {status_code}\n{text}")
+        self.status_code = status_code
+        self.text = text
+
+
+class JobCancelled(Exception):
+    """The job was cancelled while talking to the backend"""
+
+
+class ResumableUploadUnsupported(Exception):
+    """The backend does not implement the /uploads API"""
+
+
+class CancellableBody(io.RawIOBase):
+    """Request body that stops the upload as soon as the cancel event is set and reports progress"""
+
+    def __init__(self, data: bytes, cancel_event: threading.Event,
+                 on_progress: Optional[Callable[[int, int], None]] = None):
+        self._buffer = io.BytesIO(data)
+        self._size = len(data)
+        self._cancel_event = cancel_event
+        self._on_progress = on_progress
+
+    def __len__(self):
+        return self._size
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        if self._cancel_event.is_set():
+            raise JobCancelled("Upload cancelled")
+        block = self._buffer.read(UPLOAD_BLOCK_SIZE if size is None or size < 0 else size)
+        if self._on_progress:
+            self._on_progress(self._buffer.tell(), self._size)
+        return block
+
+
+class AbortableSession(requests.Session):
+    """Session whose in-flight requests can be aborted from another thread.
+
+    Every connection the session opens is tracked; ``abort`` shuts their sockets
+    down, so a request blocked on the backend's response fails right away
+    instead of holding the connection until its timeout.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._connections = []
+        self._lock = threading.Lock()
+        adapter = HTTPAdapter()
+        adapter.poolmanager.pool_classes_by_scheme = {
+            scheme: self._tracking_pool(pool)
+            for scheme, pool in adapter.poolmanager.pool_classes_by_scheme.items()
+        }
+        self.mount("http://", adapter)
+        self.mount("https://", adapter)
+
+    def _tracking_pool(self, base):
+        session = self
+
+        class TrackingPool(base):
+            def _new_conn(self):
+                conn = super()._new_conn()
+                with session._lock:
+                    session._connections.append(conn)
+                return conn
+
+        return TrackingPool
+
+    def abort(self):
+        """Close every connection of this session, including ones waiting for a response"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            sock = getattr(conn, "sock", None)
+            if sock is not None:
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+            conn.close()
+        self.close()
+
+
+def cancel_job(job_id: str) -> bool:
+    """Ask the backend to stop working on a job; returns whether it confirmed, failures are logged"""
+    try:
+        response = requests.post(f"{BACKEND_URL}/jobs/{job_id}/cancel", timeout=10)
+        if response.status_code in (200, 202, 204):
+            return True
+        logger.warning(f"Backend refused to cancel job {job_id}: {response.status_code}")
+    except requests.RequestException as e:
+        logger.warning(f"Could not cancel job {job_id} on the backend: {e}")
+    return False
+
+
+def _upload_offset(upload_id: str) -> Optional[int]:
+    """Offset the backend has acknowledged for an upload, None if it is unknown"""
+    response = requests.get(f"{BACKEND_URL}/uploads/{upload_id}", timeout=30)
+    if response.status_code == 404:
+        return None
+    if response.status_code != 200:
+        raise BackendError(response.status_code, response.text)
+    return int(response.json()["offset"])
+
+
+def _with_retries(action: Callable, description: str, cancel_event: threading.Event):
+    """Run a backend request, retrying network errors with exponential backoff"""
+    failures = 0
+    while True:
+        try:
+            return action()
+        except requests.RequestException as e:
+            failures += 1
+            if failures > UPLOAD_MAX_RETRIES:
+                raise
+            delay = min(2 ** failures, 60)
+            logger.warning(f"{description} failed ({e}), retrying in {delay}s")
+            if cancel_event.wait(delay):
+                raise JobCancelled("Upload cancelled")
+
+
+def _create_upload(filename: str, size: int, file_hash: str) -> Tuple[str, int]:
+    """POST /uploads; the new upload id is remembered in the shared store under the file hash"""
+    response = requests.post(
+        f"{BACKEND_URL}/uploads",
+        json={"filename": filename, "size": size, "sha256": file_hash},
+        timeout=30
+    )
+    if response.status_code in (404, 405):
+        raise ResumableUploadUnsupported()
+    if response.status_code not in (200, 201):
+        raise BackendError(response.status_code, response.text)
+    payload = response.json()
+    upload_id = payload["upload_id"]
+    get_store().set("uploads", file_hash, upload_id.encode("utf-8"), ttl=UPLOAD_TTL)
+    return upload_id, int(payload.get("offset", 0))
+
+
+def upload_resumable(filename: str, data: bytes, file_hash: str,
+                     cancel_event: Optional[threading.Event] = None,
+                     on_progress: Optional[Callable[[int, int], None]] = None) -> str:
+    """Upload ``data`` in checksummed chunks and return the backend upload id.
+
+    Protocol:
+      POST /uploads {filename, size, sha256}  -> {upload_id, offset}
+      GET  /uploads/<id>                      -> {offset}
+      PUT  /uploads/<id> (Content-Range, X-Chunk-SHA256) -> {offset}
+                                                 409 {offset} on offset mismatch,
+                                                 422 on checksum mismatch
+
+    The upload id is kept in the shared store under the file hash, so a retry
+    from any replica (after a reload or crash) continues at the offset the
+    backend acknowledged. Network errors are retried with exponential backoff,
+    and an upload the backend no longer knows (404, e.g. expired) is started
+    again. Raises ResumableUploadUnsupported if the backend has no /uploads endpoint.
+    """
+    cancel_event = cancel_event or threading.Event()
+    size = len(data)
+
+    def create() -> Tuple[str, int]:
+        return _with_retries(lambda: _create_upload(filename, size, file_hash), "Creating upload", cancel_event)
+
+    upload_id = (get_store().get("uploads", file_hash) or b"").decode("utf-8") or None
+    offset = _with_retries(lambda: _upload_offset(upload_id), "Upload offset probe", cancel_event) if upload_id else None
+    if offset is None:
+        upload_id, offset = create()
+    elif offset:
+        logger.info(f"Resuming upload {upload_id} of {filename} at {offset}/{size} bytes")
+
+    if on_progress:
+        on_progress(offset, size)
+
+    failures = 0
+    started = time.time()
+    view = memoryview(data)
+    while offset < size:
+        if cancel_event.is_set():
+            raise JobCancelled("Upload cancelled")
+        chunk = view[offset:offset + UPLOAD_CHUNK_SIZE].tobytes()
+        end = offset + len(chunk) - 1
+        try:
+            response = requests.put(
+                f"{BACKEND_URL}/uploads/{upload_id}",
+                data=chunk,
+                headers={
+                    "Content-Type": "application/octet-stream",
+                    "Content-Range": f"bytes {offset}-{end}/{size}",
+                    "X-Chunk-SHA256": hashlib.sha256(chunk).hexdigest(),
+                },
+                timeout=(10, 300)
+            )
+        except requests.RequestException as e:
+            failures += 1
+            if failures > UPLOAD_MAX_RETRIES:
+                raise
+            delay = min(2 ** failures, 60)
+            logger.warning(f"Chunk upload failed ({e}), retrying in {delay}s")
+            if cancel_event.wait(delay):
+                raise JobCancelled("Upload cancelled")
+            try:
+                acknowledged = _upload_offset(upload_id)
+            except requests.RequestException:
+                continue  # keep the current offset, the next PUT gets a 409 if it is wrong
+            if acknowledged is None:
+                logger.warning(f"Upload {upload_id} of {filename} expired on the backend, starting a new one")
+                upload_id, acknowledged = create()
+            offset = acknowledged
+            continue
+
+        if response.status_code == 404:
+            failures += 1
+            if failures > UPLOAD_MAX_RETRIES:
+                raise BackendError(response.status_code, response.text)
+            logger.warning(f"Upload {upload_id} of {filename} expired on the backend, starting a new one")
+            upload_id, offset = create()
+            continue
+        if response.status_code == 409:
+            # Backend holds a different offset (e.g. a chunk landed before the connection dropped)
+            failures += 1
+            if failures > UPLOAD_MAX_RETRIES:
+                raise BackendError(response.status_code, response.text)
+            offset = int(response.json()["offset"])
+            continue
+        if response.status_code == 422:
+            failures += 1
+            if failures > UPLOAD_MAX_RETRIES:
+                raise BackendError(response.status_code, response.text)
+            logger.warning(f"Checksum mismatch for bytes {offset}-{end} of {upload_id}, resending")
+            continue
+        if response.status_code not in (200, 201, 204):
+            raise BackendError(response.status_code, response.text)
+
+        offset = int(response.json()["offset"]) if response.content else end + 1
+        failures = 0
+        if on_progress:
+            on_progress(offset, size)
+
+    logger.info(f"Uploaded {filename} ({size} bytes) as {upload_id}",
+                extra={"file_hash": file_hash, "stage": "upload", "duration": time.time() - started})
+    return upload_id
+
+
+def _post_transcribe(job_id: Optional[str], cancel_event: threading.Event, **kwargs) -> Dict:
+    """POST /transcribe on a helper thread so the caller can watch the cancel event.
+
+    On cancel the backend job is cancelled and the request's connection closed.
+    The caller (a queue worker) is only released once the backend confirmed the
+    cancel or the request thread has exited, so cancelled jobs never leave
+    requests running against the backend beyond MAX_CONCURRENT_JOBS.
+    """
+    headers = kwargs.pop("headers", {})
+    if job_id:
+        headers["X-Job-ID"] = job_id
+    outcome = {}
+    started = time.time()
+    session = AbortableSession()
+
+    def post():
+        try:
+            outcome["response"] = session.post(
+                f"{BACKEND_URL}/transcribe",
+                headers=headers,
+                timeout=TRANSCRIBE_TIMEOUT,
+                **kwargs
+            )
+        except Exception as e:
+            outcome["error"] = e
+
+    request_thread = threading.Thread(target=post, name=f"transcribe-{job_id}", daemon=True)
+    request_thread.start()
+    try:
+        while request_thread.is_alive():
+            request_thread.join(0.5)
+            if cancel_event.is_set():
+                confirmed = cancel_job(job_id) if job_id else False
+                session.abort()
+                if not confirmed:
+                    request_thread.join()
+                raise JobCancelled("Processing cancelled")
+    finally:
+        session.close()
+
+    if "error" in outcome:
+        raise outcome["error"]
+    response = outcome["response"]
+    if response.status_code != 200:
+        raise BackendError(response.status_code, response.text)
+    logger.info(f"Backend finished job {job_id}",
+                extra={"job_id": job_id, "stage": "transcribe", "duration": time.time() - started})
+    return response.json()
+
+
+def transcribe(filename: str, data: bytes, job_id: Optional[str] = None,
+               cancel_event: Optional[threading.Event] = None,
+               file_hash: Optional[str] = None,
+               on_upload_progress: Optional[Callable[[int, int], None]] = None) -> Dict:
+    """Send an audio file to the backend and return the decoded /transcribe response.
+
+    With ``file_hash`` given (and RESUMABLE_UPLOADS enabled) the file is sent
+    through the resumable /uploads API and transcribed by upload id; otherwise,
+    or if the backend lacks that API, it is posted as a single multipart body.
+
+    When ``cancel_event`` is set the upload is aborted, the backend is told to
+    cancel ``job_id`` and JobCancelled is raised without waiting for the response.
+    """
+    cancel_event = cancel_event or threading.Event()
+
+    if file_hash and RESUMABLE_UPLOADS:
+        try:
+            upload_id = upload_resumable(filename, data, file_hash, cancel_event, on_upload_progress)
+        except ResumableUploadUnsupported:
+            logger.info("Backend has no resumable upload API, falling back to a single POST")
+        else:
+            return _post_transcribe(job_id, cancel_event, data={"upload_id": upload_id})
+
+    body, content_type = encode_multipart_formdata({"file": (filename, data)})
+    return _post_transcribe(
+        job_id, cancel_event,
+        data=CancellableBody(body, cancel_event, on_upload_progress),
+        headers={"Content-Type": content_type}
+    )
@@ -0,0 +1,135 @@
+"""Benchmark the streaming DOCX exporter against the python-docx object model.
+
+Usage:
+    python bench_docx_export.py [--words 10000 100000 500000] [--repeat 3]
+
+For each transcript size both implementations build the same report, each in
+its own subprocess. The best wall-clock time of ``--repeat`` runs and the
+growth of the process's peak resident set size (``ru_maxrss``) over the peak
+before exporting are reported. RSS includes lxml/libxml2 allocations, which
+tracemalloc cannot see.
+"""
+import argparse
+import io
+import json
+import random
+import resource
+import subprocess
+import sys
+import time
+from typing import Dict
+
+from docx import Document
+
+from exporters import export_to_word
+
+WORDS = ("the", "meeting", "budget", "we", "should", "review", "quarter", "results", "and",
+         "agree", "on", "next", "steps", "for", "the", "launch", "um", "so", "basically")
+
+
+def export_to_word_python_docx(transcription: str, summary: Dict, file_info: Dict) -> bytes:
+    """Previous implementation built on python-docx, kept as the baseline"""
+    doc = Document()
+    doc.add_heading('Audio Transcription & Summary Report', 0)
+
+    doc.add_heading('File Information', level=1)
+    file_info_para = doc.add_paragraph()
+    file_info_para.add_run("File: ").bold = True
+    file_info_para.add_run(f"{file_info.get('name', 'Unknown')}\n")
+    file_info_para.add_run("Duration: ").bold = True
+    file_info_para.add_run(f"{file_info.get('duration_minutes', 0):.1f} minutes\n")
+    file_info_para.add_run("Size: ").bold = True
+    file_info_para.add_run(f"{file_info.get('size_mb', 0):.1f} MB\n")
+    file_info_para.add_run("Processed: ").bold = True
+    file_info_para.add_run(f"{file_info.get('upload_time', 'Unknown')}")
+
+    doc.add_heading('Transcription', level=1)
+    doc.add_paragraph(transcription)
+
+    doc.add_heading('Summary', level=1)
+    if summary.get('overview'):
+        overview_para = doc.add_paragraph()
+        overview_para.add_run('Overview: ').bold = True
+        overview_para.add_run(summary['overview'])
+
+    for section_name, section_data in summary.items():
+        if section_name not in ['overview', 'full_text'] and section_data:
+            doc.add_heading(section_name.replace('_', ' ').title(), level=2)
+            if isinstance(section_data, list):
+                for item in section_data:
+                    doc.add_paragraph(f"• {item}")
+            else:
+                doc.add_paragraph(str(section_data))
+
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def make_report(words: int, bullets: int = 200):
+    rng = random.Random(words)
+    sentences = []
+    for i in range(0, words, 15):
+        sentences.append(" ".join(rng.choice(WORDS) for _ in range(15)).capitalize() + ".")
+    transcription = " ".join(sentences)
+    summary = {
+        "overview": " ".join(sentences[:5]),
+        "main_points": sentences[:bullets],
+        "key_insights": sentences[bullets:2 * bullets],
+        "action_items_decisions": sentences[:bullets // 2],
+        "conclusions": sentences[-bullets // 4:],
+    }
+    file_info = {"name": "bench.mp3", "duration_minutes": words / 150, "size_mb": words / 1000,
+                 "upload_time": "2024-01-01 00:00:00"}
+    return transcription, summary, file_info
+
+
+IMPLEMENTATIONS = {"python-docx": export_to_word_python_docx, "streaming": export_to_word}
+
+
+def peak_rss() -> int:
+    """Peak resident set size of this process in bytes"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def measure(name: str, words: int, repeat: int) -> Dict:
+    """Run one implementation in this (fresh) process and return its timings and memory"""
+    report = make_report(words)
+    baseline = peak_rss()
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        output = IMPLEMENTATIONS[name](*report)
+        best = min(best, time.perf_counter() - started)
+    return {"seconds": best, "peak": peak_rss() - baseline, "size": len(output)}
+
+
+def measure_in_subprocess(name: str, words: int, repeat: int) -> Dict:
+    output = subprocess.run(
+        [sys.executable, __file__, "--child", name, "--words", str(words), "--repeat", str(repeat)],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--words", type=int, nargs="+", default=[10000, 100000, 500000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--child", choices=IMPLEMENTATIONS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child, args.words[0], args.repeat)))
+        return
+
+    print(f"{'words':>8} {'implementation':<16} {'time (s)':>9} {'peak RSS +MB':>13} {'size (KB)':>10}")
+    for words in args.words:
+        for name in IMPLEMENTATIONS:
+            run = measure_in_subprocess(name, words, args.repeat)
+            print(f"{words:>8} {name:<16} {run['seconds']:>9.3f} {run['peak'] / 2 ** 20:>13.1f} {run['size'] / 1024:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+"""PDF and Word exporters for transcription reports"""
+import io
+import re
+import zipfile
+from datetime import datetime, timezone
+from typing import BinaryIO, Dict, Iterator, Optional
+from xml.sax.saxutils import escape
+
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+
+from profiling import profiled
+
+
+@profiled
+def export_full_report_to_pdf(transcription: str, summary: Dict, file_info: Dict) -> bytes:
+    """Export transcription and summary to PDF"""
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    styles = getSampleStyleSheet()
+    story = []
+    
+    # Title
+    title = Paragraph("Audio Transcription & Summary Report", styles['Title'])
+    story.append(title)
+    story.append(Spacer(1, 12))
+    
+    # File info
+    file_info_text = f"""
+    <b>File:</b> {file_info.get('name', 'Unknown')}<br/>
+    <b>Duration:</b> {file_info.get('duration_minutes', 0):.1f} minutes<br/>
+    <b>Size:</b> {file_info.get('size_mb', 0):.1f} MB<br/>
+    <b>Processed:</b> {file_info.get('upload_time', 'Unknown')}
+    """
+    story.append(Paragraph(file_info_text, styles['Normal']))
+    story.append(Spacer(1, 20))
+    
+    # Transcription
+    story.append(Paragraph("Transcription", styles['Heading1']))
+    story.append(Paragraph(transcription, styles['Normal']))
+    story.append(Spacer(1, 20))
+    
+    # Summary
+    story.append(Paragraph("Summary", styles['Heading1']))
+    
+    # Check if full_text exists and use it as the primary content
+    if summary.get('full_text'):
+        # Split the full_text into paragraphs and format them properly
+        full_text_content = summary['full_text']
+        # Replace line breaks and format for PDF
+        full_text_content = full_text_content.replace('\n', '<br/>')
+        story.append(Paragraph(full_text_content, styles['Normal']))
+        story.append(Spacer(1, 20))
+    else:
+        # Fallback to structured sections if full_text is not available
+        if summary.get('overview'):
+            story.append(Paragraph(f"<b>Overview:</b> {summary['overview']}", styles['Normal']))
+            story.append(Spacer(1, 12))
+    
+        for section_name, section_data in summary.items():
+            if section_name not in ['overview', 'full_text'] and section_data:
+                story.append(Paragraph(f"<b>{section_name.replace('_', ' ').title()}:</b>", styles['Heading2']))
+                if isinstance(section_data, list):
+                    for item in section_data:
+                        story.append(Paragraph(f"• {item}", styles['Normal']))
+                else:
+                    story.append(Paragraph(str(section_data), styles['Normal']))
+                story.append(Spacer(1, 12))
+    
+    doc.build(story)
+    buffer.seek(0)
+    return buffer.getvalue()
+
+
+@profiled
+def export_summary_to_pdf(summary: Dict, file_info: Dict) -> bytes:
+    """Export only summary to PDF"""
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    styles = getSampleStyleSheet()
+    story = []
+    
+    # Title
+    title = Paragraph("Audio Summary Report", styles['Title'])
+    story.append(title)
+    story.append(Spacer(1, 12))
+    
+    # File info
+    file_info_text = f"""
+    <b>File:</b> {file_info.get('name', 'Unknown')}<br/>
+    <b>Duration:</b> {file_info.get('duration_minutes', 0):.1f} minutes<br/>
+    <b>Size:</b> {file_info.get('size_mb', 0):.1f} MB<br/>
+    <b>Processed:</b> {file_info.get('upload_time', 'Unknown')}
+    """
+    story.append(Paragraph(file_info_text, styles['Normal']))
+    story.append(Spacer(1, 20))
+    
+    # Summary Content - Include full_text if available
+    story.append(Paragraph("Summary", styles['Heading1']))
+    
+    # Check if full_text exists and use it as the primary content
+    if summary.get('full_text'):
+        # Split the full_text into paragraphs and format them properly
+        full_text_content = summary['full_text']
+        # Replace line breaks and format for PDF
+        full_text_content = full_text_content.replace('\n', '<br/>')
+        story.append(Paragraph(full_text_content, styles['Normal']))
+        story.append(Spacer(1, 20))
+    else:
+        # Fallback to structured sections if full_text is not available
+        if summary.get('overview'):
+            story.append(Paragraph(f"<b>Overview:</b> {summary['overview']}", styles['Normal']))
+            story.append(Spacer(1, 12))
+        
+        for section_name, section_data in summary.items():
+            if section_name not in ['overview', 'full_text'] and section_data:
+                story.append(Paragraph(f"<b>{section_name.replace('_', ' ').title()}:</b>", styles['Heading2']))
+                if isinstance(section_data, list):
+                    for item in section_data:
+                        story.append(Paragraph(f"• {item}", styles['Normal']))
+                else:
+                    story.append(Paragraph(str(section_data), styles['Normal']))
+                story.append(Spacer(1, 12))
+    
+    doc.build(story)
+    buffer.seek(0)
+    return buffer.getvalue()
+
+
+# Minimal WordprocessingML package, written part by part into the zip stream
+_W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+_CONTENT_TYPES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '<Override PartName="/word/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.styles+xml"/>'
+    '<Override PartName="/word/numbering.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.numbering+xml"/>'
+    '<Override PartName="/docProps/core.xml" '
+    'ContentType="application/vnd.openxmlformats-package.core-properties+xml"/>'
+    '</Types>'
+)
+
+_PACKAGE_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Target="word/document.xml" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+    '<Relationship Id="rId2" Target="docProps/core.xml" '
+    'Type="http://schemas.openxmlformats.org/package/2006/relationships/metadata/core-properties"/>'
+    '</Relationships>'
+)
+
+_DOCUMENT_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Target="styles.xml" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles"/>'
+    '<Relationship Id="rId2" Target="numbering.xml" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/numbering"/>'
+    '</Relationships>'
+)
+
+# Sizes and colours follow python-docx's default template so reports look the same
+_STYLES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    f'<w:styles xmlns:w="{_W_NS}">'
+    '<w:docDefaults><w:rPrDefault><w:rPr>'
+    '<w:rFonts w:ascii="Calibri" w:hAnsi="Calibri" w:eastAsia="Calibri" w:cs="Calibri"/>'
+    '<w:sz w:val="22"/><w:szCs w:val="22"/>'
+    '</w:rPr></w:rPrDefault>'
+    '<w:pPrDefault><w:pPr><w:spacing w:after="200" w:line="276" w:lineRule="auto"/></w:pPr></w:pPrDefault>'
+    '</w:docDefaults>'
+    '<w:style w:type="paragraph" w:default="1" w:styleId="Normal"><w:name w:val="Normal"/><w:qFormat/></w:style>'
+    '<w:style w:type="paragraph" w:styleId="Title"><w:name w:val="Title"/><w:basedOn w:val="Normal"/>'
+    '<w:next w:val="Normal"/><w:qFormat/><w:pPr><w:spacing w:after="300" w:line="240" w:lineRule="auto"/></w:pPr>'
+    '<w:rPr><w:color w:val="17365D"/><w:spacing w:val="5"/><w:kern w:val="28"/>'
+    '<w:sz w:val="52"/><w:szCs w:val="52"/></w:rPr></w:style>'
+    '<w:style w:type="paragraph" w:styleId="Heading1"><w:name w:val="heading 1"/><w:basedOn w:val="Normal"/>'
+    '<w:next w:val="Normal"/><w:qFormat/><w:pPr><w:keepNext/><w:keepLines/><w:spacing w:before="480" w:after="0"/>'
+    '<w:outlineLvl w:val="0"/></w:pPr><w:rPr><w:b/><w:bCs/><w:color w:val="365F91"/>'
+    '<w:sz w:val="28"/><w:szCs w:val="28"/></w:rPr></w:style>'
+    '<w:style w:type="paragraph" w:styleId="Heading2"><w:name w:val="heading 2"/><w:basedOn w:val="Normal"/>'
+    '<w:next w:val="Normal"/><w:qFormat/><w:pPr><w:keepNext/><w:keepLines/><w:spacing w:before="200" w:after="0"/>'
+    '<w:outlineLvl w:val="1"/></w:pPr><w:rPr><w:b/><w:bCs/><w:color w:val="4F81BD"/>'
+    '<w:sz w:val="26"/><w:szCs w:val="26"/></w:rPr></w:style>'
+    '<w:style w:type="paragraph" w:styleId="ListBullet"><w:name w:val="List Bullet"/><w:basedOn w:val="Normal"/>'
+    '<w:pPr><w:numPr><w:numId w:val="1"/></w:numPr><w:spacing w:after="60"/></w:pPr></w:style>'
+    '</w:styles>'
+)
+
+_NUMBERING_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    f'<w:numbering xmlns:w="{_W_NS}">'
+    '<w:abstractNum w:abstractNumId="0"><w:multiLevelType w:val="singleLevel"/>'
+    '<w:lvl w:ilvl="0"><w:start w:val="1"/><w:numFmt w:val="bullet"/><w:lvlText w:val="\u2022"/>'
+    '<w:lvlJc w:val="left"/><w:pPr><w:ind w:left="720" w:hanging="360"/></w:pPr></w:lvl>'
+    '</w:abstractNum>'
+    '<w:num w:numId="1"><w:abstractNumId w:val="0"/></w:num>'
+    '</w:numbering>'
+)
+
+_SECTION_XML = (
+    '<w:sectPr><w:pgSz w:w="12240" w:h="15840"/>'
+    '<w:pgMar w:top="1440" w:right="1800" w:bottom="1440" w:left="1800" '
+    'w:header="720" w:footer="720" w:gutter="0"/></w:sectPr>'
+)
+
+# Characters that are not allowed in XML 1.0 documents
+_INVALID_XML_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+# Long transcripts are split into paragraphs of at most this many characters
+SEGMENT_CHARS = 1500
+
+
+def _xml_text(text: str) -> str:
+    return escape(_INVALID_XML_CHARS.sub("", text))
+
+
+def _run(text: str, bold: bool = False) -> str:
+    props = "<w:rPr><w:b/></w:rPr>" if bold else ""
+    return f'<w:r>{props}<w:t xml:space="preserve">{_xml_text(text)}</w:t></w:r>'
+
+
+def _paragraph(runs: str, style: Optional[str] = None) -> str:
+    props = f'<w:pPr><w:pStyle w:val="{style}"/></w:pPr>' if style else ""
+    return f"<w:p>{props}{runs}</w:p>"
+
+
+def _segments(text: str, max_chars: int = SEGMENT_CHARS) -> Iterator[str]:
+    """Yield paragraphs of ``text``: one per line, long lines cut at sentence ends"""
+    for match in re.finditer(r"[^\n]+", text):
+        line = match.group(0).strip()
+        while len(line) > max_chars:
+            cut = line.rfind(". ", 0, max_chars) + 1
+            if cut <= 0:
+                cut = line.rfind(" ", 0, max_chars)
+            if cut <= 0:
+                cut = max_chars
+            yield line[:cut]
+            line = line[cut:].lstrip()
+        if line:
+            yield line
+
+
+def write_word_report(target: BinaryIO, transcription: str, summary: Dict, file_info: Dict):
+    """Stream a transcription report as DOCX into ``target`` (a file or buffer).
+
+    document.xml is generated paragraph by paragraph straight into the
+    compressed zip entry, so the transcript is never held as an object tree.
+    """
+    title = "Audio Transcription & Summary Report"
+    created = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    with zipfile.ZipFile(target, "w", zipfile.ZIP_DEFLATED) as package:
+        package.writestr("[Content_Types].xml", _CONTENT_TYPES_XML)
+        package.writestr("_rels/.rels", _PACKAGE_RELS_XML)
+        package.writestr("docProps/core.xml", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<cp:coreProperties '
+            'xmlns:cp="http://schemas.openxmlformats.org/package/2006/metadata/core-properties" '
+            'xmlns:dc="http://purl.org/dc/elements/1.1/" xmlns:dcterms="http://purl.org/dc/terms/" '
+            'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">'
+            f'<dc:title>{_xml_text(title)}</dc:title>'
+            f'<dcterms:created xsi:type="dcterms:W3CDTF">{created}</dcterms:created>'
+            '</cp:coreProperties>'
+        ))
+        package.writestr("word/_rels/document.xml.rels", _DOCUMENT_RELS_XML)
+        package.writestr("word/styles.xml", _STYLES_XML)
+        package.writestr("word/numbering.xml", _NUMBERING_XML)
+
+        with io.TextIOWrapper(package.open("word/document.xml", "w"), encoding="utf-8") as doc:
+            doc.write(
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                f'<w:document xmlns:w="{_W_NS}"><w:body>'
+            )
+
+            # Title
+            doc.write(_paragraph(_run(title), "Title"))
+
+            # File info
+            doc.write(_paragraph(_run("File Information"), "Heading1"))
+            doc.write(_paragraph("<w:r><w:br/></w:r>".join([
+                _run("File: ", bold=True) + _run(f"{file_info.get('name', 'Unknown')}"),
+                _run("Duration: ", bold=True) + _run(f"{file_info.get('duration_minutes', 0):.1f} minutes"),
+                _run("Size: ", bold=True) + _run(f"{file_info.get('size_mb', 0):.1f} MB"),
+                _run("Processed: ", bold=True) + _run(f"{file_info.get('upload_time', 'Unknown')}"),
+            ])))
+
+            # Transcription
+            doc.write(_paragraph(_run("Transcription"), "Heading1"))
+            for segment in _segments(transcription):
+                doc.write(_paragraph(_run(segment)))
+
+            # Summary
+            doc.write(_paragraph(_run("Summary"), "Heading1"))
+            if summary.get('overview'):
+                doc.write(_paragraph(_run("Overview: ", bold=True) + _run(summary['overview'])))
+
+            for section_name, section_data in summary.items():
+                if section_name not in ['overview', 'full_text'] and section_data:
+                    doc.write(_paragraph(_run(section_name.replace('_', ' ').title()), "Heading2"))
+                    if isinstance(section_data, list):
+                        for item in section_data:
+                            doc.write(_paragraph(_run(str(item)), "ListBullet"))
+                    else:
+                        doc.write(_paragraph(_run(str(section_data))))
+
+            doc.write(_SECTION_XML + "</w:body></w:document>")
+
+
+@profiled
+def export_to_word(transcription: str, summary: Dict, file_info: Dict) -> bytes:
+    """Export transcription and summary to Word document"""
+    buffer = io.BytesIO()
+    write_word_report(buffer, transcription, summary, file_info)
+    return buffer.getvalue()
@@ -0,0 +1,306 @@
+"""Frontend-side processing queue with admission control and fair scheduling.
+
+Jobs are run by a fixed pool of worker threads, so at most ``max_concurrency``
+requests are in flight against the backend from this process. With
+``BackendSlots`` the cap is also shared through the store with every other
+replica and the watch-folder service. When a worker frees up the next job is
+chosen by:
+
+1. users with less recent service first: jobs started within the last
+   ``fairness_window`` seconds, plus any still running (per-user fairness),
+2. shorter audio first, with waiting time credited so long files still advance,
+3. submission order.
+
+Finishing a job does not change a user's recent service, so the queue
+position shown while waiting follows the same rule as the actual pick.
+"""
+import itertools
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from shared_store import BaseStore
+
+logger = logging.getLogger("frontend")
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+
+
+class QueueFullError(Exception):
+    """Raised when a job is rejected by admission control"""
+
+
+class BackendSlots:
+    """Cap on backend requests shared by every process that uses the same store.
+
+    A running request holds a lease on one of ``limit`` keys in the
+    ``backend_slots`` namespace, taken with ``add`` and renewed while it runs,
+    so slots of a crashed process expire after ``lease_seconds``.
+    """
+
+    NAMESPACE = "backend_slots"
+
+    def __init__(self, store: BaseStore, limit: int, lease_seconds: int = 60, poll_interval: float = 1.0):
+        self.store = store
+        self.limit = limit
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+
+    def _try_acquire(self, token: bytes) -> Optional[str]:
+        for i in range(self.limit):
+            if self.store.add(self.NAMESPACE, str(i), token, ttl=self.lease_seconds):
+                return str(i)
+        return None
+
+    def _renew(self, slot: str, token: bytes, released: threading.Event):
+        while not released.wait(self.lease_seconds / 3):
+            if self.store.get(self.NAMESPACE, slot) != token:
+                logger.warning(f"Lost backend slot {slot}, its lease expired")
+                return
+            self.store.set(self.NAMESPACE, slot, token, ttl=self.lease_seconds)
+
+    @contextmanager
+    def hold(self):
+        """Block until a slot is free and keep it for the duration of the block"""
+        token = uuid.uuid4().hex.encode("utf-8")
+        slot = self._try_acquire(token)
+        while slot is None:
+            time.sleep(self.poll_interval)
+            slot = self._try_acquire(token)
+
+        released = threading.Event()
+        threading.Thread(target=self._renew, args=(slot, token, released),
+                         name=f"backend-slot-{slot}", daemon=True).start()
+        try:
+            yield slot
+        finally:
+            released.set()
+            if self.store.get(self.NAMESPACE, slot) == token:
+                self.store.delete(self.NAMESPACE, slot)
+
+
+@dataclass
+class Job:
+    job_id: str
+    user_id: str
+    filename: str
+    data: Optional[bytes]
+    file_hash: str
+    duration_seconds: float
+    seq: int
+    status: str = QUEUED
+    stage: str = QUEUED
+    # Fraction (0-1) of the current stage, when the runner can report it
+    progress: float = 0.0
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[Dict] = None
+    error: Optional[str] = None
+    last_heartbeat: float = field(default_factory=time.time)
+    cancel_event: threading.Event = field(default_factory=threading.Event)
+
+
+class JobQueue:
+    """Bounded, fair job queue executed by a pool of worker threads"""
+
+    def __init__(self, runner: Callable[[Job], Dict], max_concurrency: int = 2,
+                 max_queue_length: int = 50, max_queued_per_user: int = 3,
+                 aging_factor: float = 1.0, retention_seconds: int = 3600,
+                 abandon_timeout: Optional[float] = 60, fairness_window: float = 900,
+                 slots: Optional[BackendSlots] = None):
+        self.runner = runner
+        self.max_concurrency = max_concurrency
+        self.max_queue_length = max_queue_length
+        self.max_queued_per_user = max_queued_per_user
+        # Seconds of audio credited per second spent waiting
+        self.aging_factor = aging_factor
+        self.retention_seconds = retention_seconds
+        # Jobs nobody has polled for this long are cancelled (None disables)
+        self.abandon_timeout = abandon_timeout
+        self.fairness_window = fairness_window
+        self.slots = slots
+
+        self._jobs: Dict[str, Job] = {}
+        # (started_at, user_id) of jobs started within the fairness window, oldest first
+        self._recent_starts: Deque[Tuple[float, str]] = deque()
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        for i in range(max_concurrency):
+            threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True).start()
+        if abandon_timeout:
+            threading.Thread(target=self._reaper, name="job-reaper", daemon=True).start()
+
+    def submit(self, user_id: str, filename: str, data: bytes, file_hash: str,
+               duration_seconds: float) -> Job:
+        """Admit a job or raise QueueFullError"""
+        with self._cond:
+            self._prune()
+            queued = self._queued()
+            if len(queued) >= self.max_queue_length:
+                raise QueueFullError("The processing queue is full, please try again later")
+            if sum(1 for job in queued if job.user_id == user_id) >= self.max_queued_per_user:
+                raise QueueFullError(
+                    f"You already have {self.max_queued_per_user} files waiting, "
+                    "please wait for them to finish"
+                )
+            job = Job(
+                job_id=uuid.uuid4().hex,
+                user_id=user_id,
+                filename=filename,
+                data=data,
+                file_hash=file_hash,
+                duration_seconds=duration_seconds or 0,
+                seq=next(self._seq)
+            )
+            self._jobs[job.job_id] = job
+            self._cond.notify()
+        logger.info(f"Queued job {job.job_id} ({filename}, {duration_seconds:.0f}s) for user {user_id}",
+                    extra={"job_id": job.job_id, "user_id": user_id, "file_hash": file_hash, "stage": QUEUED})
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._cond:
+            return self._jobs.get(job_id)
+
+    def heartbeat(self, job_id: str):
+        """Record that someone is still waiting for the job"""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.last_heartbeat = time.time()
+
+    def cancel(self, job_id: str, reason: str = "Cancelled by user") -> bool:
+        """Cancel a queued or running job; returns False if it already finished"""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in FINISHED_STATES:
+                return False
+            job.cancel_event.set()
+            job.error = reason
+            if job.status == QUEUED:
+                # Never started: finish it right away and drop the payload
+                job.status = job.stage = CANCELLED
+                job.data = None
+                job.finished_at = time.time()
+        logger.info(f"Cancelling job {job_id}: {reason}", extra={"job_id": job_id, "stage": CANCELLED})
+        return True
+
+    def position(self, job_id: str) -> int:
+        """1-based position in the dispatch order, 0 if the job is not waiting"""
+        with self._cond:
+            for i, job in enumerate(self._dispatch_order(), 1):
+                if job.job_id == job_id:
+                    return i
+            return 0
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {
+                "queued": len(self._queued()),
+                "running": sum(1 for job in self._jobs.values() if job.status == RUNNING),
+                "max_concurrency": self.max_concurrency,
+            }
+
+    def _queued(self) -> List[Job]:
+        return [job for job in self._jobs.values() if job.status == QUEUED]
+
+    def _prune(self):
+        cutoff = time.time() - self.retention_seconds
+        for job_id in [j.job_id for j in self._jobs.values()
+                       if j.status in FINISHED_STATES and j.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+    def _recent_service(self, now: float) -> Dict[str, int]:
+        """Jobs per user started within the fairness window, plus older ones still running"""
+        cutoff = now - self.fairness_window
+        while self._recent_starts and self._recent_starts[0][0] < cutoff:
+            self._recent_starts.popleft()
+
+        service: Dict[str, int] = {}
+        for _, user_id in self._recent_starts:
+            service[user_id] = service.get(user_id, 0) + 1
+        for job in self._jobs.values():
+            if job.status == RUNNING and job.started_at < cutoff:
+                service[job.user_id] = service.get(job.user_id, 0) + 1
+        return service
+
+    def _dispatch_order(self) -> List[Job]:
+        """Order in which queued jobs would be started; the workers pick its first entry"""
+        now = time.time()
+        service = self._recent_service(now)
+
+        remaining = self._queued()
+        order = []
+        while remaining:
+            nxt = min(remaining, key=lambda j: (
+                service.get(j.user_id, 0),
+                j.duration_seconds - self.aging_factor * (now - j.submitted_at),
+                j.seq
+            ))
+            order.append(nxt)
+            remaining.remove(nxt)
+            service[nxt.user_id] = service.get(nxt.user_id, 0) + 1
+        return order
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._queued():
+                    self._cond.wait()
+            # Take the shared slot first, so the job is picked only once it can really start
+            with self.slots.hold() if self.slots else nullcontext():
+                with self._cond:
+                    order = self._dispatch_order()
+                    if not order:
+                        continue
+                    job = order[0]
+                    job.status = RUNNING
+                    job.stage = RUNNING
+                    job.started_at = time.time()
+                    self._recent_starts.append((job.started_at, job.user_id))
+
+                wait = job.started_at - job.submitted_at
+                logger.info(f"Starting job {job.job_id} after {wait:.1f}s in queue",
+                            extra={"job_id": job.job_id, "user_id": job.user_id, "stage": "queue_wait", "duration": wait})
+                try:
+                    result = self.runner(job)
+                    status, error = COMPLETED, None
+                except Exception as e:
+                    if job.cancel_event.is_set():
+                        result, status, error = None, CANCELLED, job.error
+                    else:
+                        logger.error(f"Job {job.job_id} failed: {e}", extra={"job_id": job.job_id, "stage": FAILED})
+                        result, status, error = None, FAILED, str(e)
+
+            with self._cond:
+                job.result = result
+                job.error = error
+                job.status = status
+                job.stage = status
+                job.data = None
+                job.finished_at = time.time()
+            elapsed = job.finished_at - job.started_at
+            logger.info(f"Job {job.job_id} {status} in {elapsed:.1f}s",
+                        extra={"job_id": job.job_id, "user_id": job.user_id, "stage": status, "duration": elapsed})
+
+    def _reaper(self):
+        while True:
+            time.sleep(min(self.abandon_timeout / 4, 5))
+            cutoff = time.time() - self.abandon_timeout
+            with self._cond:
+                abandoned = [job.job_id for job in self._jobs.values()
+                             if job.status in (QUEUED, RUNNING) and job.last_heartbeat < cutoff]
+            for job_id in abandoned:
+                self.cancel(job_id, reason="Session disconnected")
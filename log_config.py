@@ -0,0 +1,100 @@
+"""Process-wide logging setup: non-blocking queue handler, rotating JSON log file.
+
+Callers only enqueue records; a background QueueListener thread formats them
+and does the disk and console I/O. Fields passed through ``extra`` (job ids,
+stages, durations) are written as top-level keys of the JSON records, e.g.::
+
+    logger.info("Job finished", extra={"job_id": job.job_id, "stage": "transcribe", "duration": 12.3})
+"""
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+STRUCTURED_FIELDS = ("job_id", "user_id", "file_hash", "stage", "duration")
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, including structured ``extra`` fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        for field in STRUCTURED_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = round(value, 3) if isinstance(value, float) else value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that keeps the traceback out of the message.
+
+    The stock ``prepare`` formats the traceback into ``msg``; here it is
+    rendered into ``exc_text`` instead, so the JSON formatter can write it as
+    its own ``exception`` field and the console formatter still appends it.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        # Tracebacks hold frames; only the rendered text crosses the queue
+        record.exc_info = None
+        return record
+
+
+def configure_logging(log_file: str = "logs/frontend.log", level: Optional[str] = None,
+                      max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5):
+    """Install the queue-based handlers on the root logger; later calls are no-ops.
+
+    Safe to call on every Streamlit rerun: the listener lives in this module,
+    which is imported once per process.
+    """
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return
+
+        Path(log_file).parent.mkdir(parents=True, exist_ok=True)
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file,
+            maxBytes=int(os.getenv("LOG_MAX_BYTES", str(max_bytes))),
+            backupCount=int(os.getenv("LOG_BACKUP_COUNT", str(backup_count))),
+            encoding="utf-8"
+        )
+        file_handler.setFormatter(JsonFormatter())
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+
+        log_queue = queue.Queue(-1)
+        _listener = logging.handlers.QueueListener(
+            log_queue, file_handler, stream_handler, respect_handler_level=True
+        )
+        _listener.start()
+        atexit.register(_listener.stop)
+
+        root = logging.getLogger()
+        root.setLevel(level or os.getenv("LOG_LEVEL", "INFO"))
+        root.addHandler(_QueueHandler(log_queue))
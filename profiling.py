@@ -0,0 +1,123 @@
+"""Opt-in profiling of Streamlit reruns.
+
+``profile_rerun`` runs one script execution under cProfile and dumps the
+result to ``PROFILE_DIR`` as a ``.prof`` file (open it with ``snakeviz`` or
+``python -m pstats``); only the newest ``PROFILE_MAX_FILES`` dumps are kept.
+Functions decorated with ``@profiled`` also record wall-clock timings while a
+rerun on the same thread is being profiled; when profiling is off the
+decorator adds a single thread-local lookup.
+"""
+import cProfile
+import functools
+import logging
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger("frontend")
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "50"))
+
+# Streamlit runs each session's script on its own thread
+_active = threading.local()
+
+
+@dataclass
+class RerunProfile:
+    profiler: Optional[cProfile.Profile]
+    started: float = field(default_factory=time.perf_counter)
+    wall_time: float = 0.0
+    # function name -> [calls, total seconds]
+    timings: Dict[str, List[float]] = field(default_factory=dict)
+    dump_path: Optional[str] = None
+
+
+def profiled(func):
+    """Record wall-clock time of ``func`` while the current rerun is profiled"""
+    name = func.__qualname__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        profile = getattr(_active, "profile", None)
+        if profile is None:
+            return func(*args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            entry = profile.timings.setdefault(name, [0, 0.0])
+            entry[0] += 1
+            entry[1] += time.perf_counter() - started
+
+    return wrapper
+
+
+@contextmanager
+def profile_rerun(enabled: bool, label: str = "rerun"):
+    """Profile the enclosed block; yields the RerunProfile, or None when disabled"""
+    if not enabled:
+        yield None
+        return
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError as e:
+        # Only one cProfile can be active at a time on newer Pythons; keep the timers
+        logger.warning(f"cProfile unavailable for this rerun: {e}")
+        profiler = None
+
+    profile = RerunProfile(profiler=profiler)
+    _active.profile = profile
+    try:
+        yield profile
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        profile.wall_time = time.perf_counter() - profile.started
+        _active.profile = None
+        if profiler is not None:
+            Path(PROFILE_DIR).mkdir(parents=True, exist_ok=True)
+            profile.dump_path = str(Path(PROFILE_DIR) / f"{label}-{time.strftime('%Y%m%d-%H%M%S')}-{threading.get_ident()}.prof")
+            profiler.dump_stats(profile.dump_path)
+            _prune_dumps()
+        logger.info(f"Profiled {label} in {profile.wall_time:.3f}s",
+                    extra={"stage": label, "duration": profile.wall_time})
+
+
+def _prune_dumps():
+    """Delete the oldest .prof files beyond PROFILE_MAX_FILES"""
+    dumps = sorted(Path(PROFILE_DIR).glob("*.prof"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for path in dumps[PROFILE_MAX_FILES:]:
+        path.unlink(missing_ok=True)
+
+
+def timer_rows(profile: RerunProfile) -> List[Dict]:
+    """Wall-clock timings of @profiled functions, slowest first"""
+    rows = [
+        {"Function": name, "Calls": int(calls), "Total (ms)": total * 1000, "Per call (ms)": total * 1000 / calls}
+        for name, (calls, total) in profile.timings.items()
+    ]
+    return sorted(rows, key=lambda row: row["Total (ms)"], reverse=True)
+
+
+def hot_function_rows(profile: RerunProfile, limit: int = 25) -> List[Dict]:
+    """Top functions of the cProfile run by cumulative time"""
+    if profile.profiler is None:
+        return []
+    stats = pstats.Stats(profile.profiler)
+    rows = []
+    for (filename, line, func), (_, ncalls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({
+            "Function": f"{func} ({Path(filename).name}:{line})",
+            "Calls": ncalls,
+            "Own (ms)": tottime * 1000,
+            "Cumulative (ms)": cumtime * 1000,
+        })
+    return sorted(rows, key=lambda row: row["Cumulative (ms)"], reverse=True)[:limit]
@@ -0,0 +1,228 @@
+"""Memory-bounded cache for transcription results.
+
+Sessions keep only a result id; the results themselves live here:
+
+- hot results in a process-wide LRU limited to ``max_bytes`` of serialized size,
+- without a shared store, results evicted from the LRU are spilled to JSON
+  files in ``spill_dir``,
+- with a shared store (multi-replica mode), the store is the source of truth:
+  nothing is spilled, and hot entries are checked against the version stored
+  with each result at most every ``revalidate_seconds``, so a result rewritten
+  on another replica is picked up.
+
+``build_result`` and ``record_run`` define what is stored for a finished
+backend run; the web app and the watch-folder service both use them.
+"""
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+from shared_store import BaseStore, get_store
+from transcript_analytics import compute_analytics
+
+logger = logging.getLogger("frontend")
+
+# Audio sha256, optionally followed by the instructions digest of a regenerated summary.
+# Ids come from the ?result= query parameter and name spill files, so nothing else is accepted.
+RESULT_ID_PATTERN = re.compile(r"[0-9a-f]{64}(\.[0-9a-f]{16})?")
+
+
+class ResultManager:
+    """Process-wide LRU of results with spill-to-disk and resident-size metrics"""
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024, spill_dir: str = "/tmp/result_spill",
+                 max_spill_bytes: int = 2 * 1024 * 1024 * 1024, store: Optional[BaseStore] = None,
+                 revalidate_seconds: float = 5):
+        self.max_bytes = max_bytes
+        self.max_spill_bytes = max_spill_bytes
+        self.spill_dir = Path(spill_dir)
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+        self.store = store
+        self.revalidate_seconds = revalidate_seconds
+
+        # result_id -> (result, serialized size, store version, last checked)
+        self._hot: "OrderedDict[str, tuple]" = OrderedDict()
+        self._resident_bytes = 0
+        # result_id -> file size of spilled results, oldest first; scanned once, then kept up to date
+        self._spilled: "OrderedDict[str, int]" = OrderedDict()
+        self._spilled_bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "disk_hits": 0, "store_hits": 0, "misses": 0, "spills": 0}
+
+        if store is None:
+            for path in sorted(self.spill_dir.glob("*.json"), key=lambda p: p.stat().st_mtime):
+                size = path.stat().st_size
+                self._spilled[path.stem] = size
+                self._spilled_bytes += size
+
+    def _spill_path(self, result_id: str) -> Path:
+        return self.spill_dir / f"{result_id}.json"
+
+    def put(self, result_id: str, result: Dict):
+        """Add or replace a result; it becomes the most recently used entry"""
+        if not RESULT_ID_PATTERN.fullmatch(result_id):
+            raise ValueError(f"Invalid result id: {result_id!r}")
+        payload = json.dumps(result).encode("utf-8")
+        version = None
+        if self.store is not None:
+            version = uuid.uuid4().hex
+            self.store.set("results", result_id, payload)
+            self.store.set("result_versions", result_id, version.encode("utf-8"))
+        else:
+            self._unspill(result_id)
+        self._insert(result_id, result, len(payload), version)
+
+    def get(self, result_id: str) -> Optional[Dict]:
+        """Return a result from memory, the spill directory or the shared store; None if unknown"""
+        if not RESULT_ID_PATTERN.fullmatch(result_id):
+            return None
+        with self._lock:
+            entry = self._hot.get(result_id)
+            if entry is not None:
+                result, size, version, checked = entry
+                if self.store is None or time.time() - checked < self.revalidate_seconds:
+                    self._hot.move_to_end(result_id)
+                    self._counters["hits"] += 1
+                    return result
+
+        if entry is not None:
+            current = self.store.get("result_versions", result_id)
+            current = current.decode("utf-8") if current is not None else None
+            if current == version:
+                with self._lock:
+                    if result_id in self._hot:
+                        self._hot[result_id] = (result, size, version, time.time())
+                        self._hot.move_to_end(result_id)
+                    self._counters["hits"] += 1
+                return result
+            logger.info(f"Result {result_id} changed in the shared store, reloading", extra={"file_hash": result_id})
+
+        payload = version = None
+        if self.store is None:
+            try:
+                payload = self._spill_path(result_id).read_bytes()
+                self._counters["disk_hits"] += 1
+            except FileNotFoundError:
+                pass
+        else:
+            # Version first: a concurrent put then at worst causes one extra reload
+            version = self.store.get("result_versions", result_id)
+            version = version.decode("utf-8") if version is not None else None
+            payload = self.store.get("results", result_id)
+            if payload is not None:
+                self._counters["store_hits"] += 1
+        if payload is None:
+            self._counters["misses"] += 1
+            return None
+
+        result = json.loads(payload.decode("utf-8"))
+        self._insert(result_id, result, len(payload), version)
+        return result
+
+    def _insert(self, result_id: str, result: Dict, size: int, version: Optional[str] = None):
+        to_spill = []
+        with self._lock:
+            old = self._hot.pop(result_id, None)
+            if old is not None:
+                self._resident_bytes -= old[1]
+            self._hot[result_id] = (result, size, version, time.time())
+            self._resident_bytes += size
+            # Always keep the newest entry, even if it alone exceeds the budget
+            while self._resident_bytes > self.max_bytes and len(self._hot) > 1:
+                cold_id, (cold_result, cold_size, _, _) = self._hot.popitem(last=False)
+                self._resident_bytes -= cold_size
+                to_spill.append((cold_id, cold_result))
+
+        # With a shared store evicted results are simply reloaded from it
+        if self.store is None:
+            for cold_id, cold_result in to_spill:
+                self._spill(cold_id, cold_result)
+
+    def _spill(self, result_id: str, result: Dict):
+        with self._lock:
+            spilled = result_id in self._spilled
+        if not spilled:
+            path = self._spill_path(result_id)
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(result), encoding="utf-8")
+            os.replace(tmp_path, path)
+            size = path.stat().st_size
+            with self._lock:
+                self._spilled[result_id] = size
+                self._spilled_bytes += size
+        self._counters["spills"] += 1
+        logger.info(f"Spilled result {result_id} to disk", extra={"file_hash": result_id, "stage": "spill"})
+        self._prune_spill_dir()
+
+    def _unspill(self, result_id: str):
+        """Drop the spilled copy of a result that is being replaced"""
+        with self._lock:
+            size = self._spilled.pop(result_id, None)
+            if size is not None:
+                self._spilled_bytes -= size
+        if size is not None:
+            self._spill_path(result_id).unlink(missing_ok=True)
+
+    def _prune_spill_dir(self):
+        """Delete the oldest spilled results until the directory is within max_spill_bytes"""
+        to_delete = []
+        with self._lock:
+            while self._spilled_bytes > self.max_spill_bytes and self._spilled:
+                old_id, size = self._spilled.popitem(last=False)
+                self._spilled_bytes -= size
+                to_delete.append(old_id)
+        for old_id in to_delete:
+            self._spill_path(old_id).unlink(missing_ok=True)
+
+    def metrics(self) -> Dict:
+        with self._lock:
+            return {
+                "resident_bytes": self._resident_bytes,
+                "resident_entries": len(self._hot),
+                "max_bytes": self.max_bytes,
+                "spilled_entries": len(self._spilled),
+                "spilled_bytes": self._spilled_bytes,
+                **self._counters,
+            }
+
+
+def build_result(data: Dict, duration_seconds: float = 0) -> Dict:
+    """Result entry for a backend response; transcript analytics are computed once, here"""
+    transcription = data.get("transcription", "")
+    return {
+        "transcription": transcription,
+        "summary": data.get("summary", {}),
+        "processing_time": data.get("processing_time", {}),
+        "analytics": data.get("analytics") or compute_analytics(
+            transcription, data.get("segments"), duration_seconds
+        ),
+    }
+
+
+def record_run(run_id: str, duration_seconds: float, queue_wait: float, result: Dict):
+    """Store timing of a completed backend run for the throughput dashboard.
+
+    Keys start with the zero-padded finish time in milliseconds, so the most
+    recent runs can be selected from the key list without loading every run.
+    """
+    processing_time = result.get("processing_time", {}) or {}
+    analytics = result.get("analytics", {}) or {}
+    finished_at = time.time()
+    get_store().set_json("runs", f"{int(finished_at * 1000):013d}-{run_id}", {
+        "finished_at": finished_at,
+        "duration_seconds": duration_seconds,
+        "queue_wait": queue_wait,
+        "transcription": processing_time.get("transcription", 0),
+        "summarization": processing_time.get("summarization", 0),
+        "total": processing_time.get("total", 0),
+        "word_count": analytics.get("word_count", 0),
+        "words_per_minute": analytics.get("words_per_minute", 0),
+        "filler_rate": analytics.get("filler_rate", 0),
+    })
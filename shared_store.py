@@ -0,0 +1,246 @@
+"""Shared store for file info, transcription results and export artifacts.
+
+The backend is chosen with the ``SHARED_STORE_URL`` environment variable:
+
+- unset or ``memory://``        process-local dict (single replica, default)
+- ``sqlite:////data/store.db``  SQLite database on a volume shared by all replicas
+- ``redis://host:6379/0``       Redis or any Redis-compatible server
+
+Values are raw bytes; ``get_json``/``set_json`` wrap them for dictionaries.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger("frontend")
+
+DEFAULT_TTL = int(os.getenv("SHARED_STORE_TTL", str(7 * 24 * 3600)))
+
+
+class BaseStore:
+    """Namespaced key/value store with optional per-entry TTL (seconds)"""
+
+    def get(self, namespace: str, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, namespace: str, key: str, value: bytes, ttl: Optional[int] = DEFAULT_TTL):
+        raise NotImplementedError
+
+    def add(self, namespace: str, key: str, value: bytes, ttl: Optional[int] = DEFAULT_TTL) -> bool:
+        """Set only if the key does not exist yet; returns True if it was stored"""
+        raise NotImplementedError
+
+    def delete(self, namespace: str, key: str):
+        raise NotImplementedError
+
+    def keys(self, namespace: str) -> List[str]:
+        raise NotImplementedError
+
+    def get_json(self, namespace: str, key: str) -> Optional[Dict]:
+        raw = self.get(namespace, key)
+        if raw is None:
+            return None
+        try:
+            return json.loads(raw.decode("utf-8"))
+        except ValueError as e:
+            logger.error(f"Corrupt JSON in store {namespace}/{key}: {e}")
+            return None
+
+    def set_json(self, namespace: str, key: str, value: Dict, ttl: Optional[int] = DEFAULT_TTL):
+        self.set(namespace, key, json.dumps(value).encode("utf-8"), ttl)
+
+
+class MemoryStore(BaseStore):
+    """Process-local store; state is lost on restart and not shared between replicas"""
+
+    # Expired entries are swept on every Nth write so unread keys do not pile up
+    SWEEP_EVERY = 256
+
+    def __init__(self):
+        self._data: Dict[tuple, tuple] = {}
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def _live(self, item_key: tuple) -> Optional[tuple]:
+        item = self._data.get(item_key)
+        if item is not None and item[1] is not None and item[1] < time.time():
+            del self._data[item_key]
+            return None
+        return item
+
+    def get(self, namespace, key):
+        with self._lock:
+            item = self._live((namespace, key))
+            return item[0] if item else None
+
+    def set(self, namespace, key, value, ttl=DEFAULT_TTL):
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._data[(namespace, key)] = (value, expires_at)
+            self._writes += 1
+            if self._writes % self.SWEEP_EVERY == 0:
+                for item_key in list(self._data):
+                    self._live(item_key)
+
+    def add(self, namespace, key, value, ttl=DEFAULT_TTL):
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            if self._live((namespace, key)) is not None:
+                return False
+            self._data[(namespace, key)] = (value, expires_at)
+            return True
+
+    def delete(self, namespace, key):
+        with self._lock:
+            self._data.pop((namespace, key), None)
+
+    def keys(self, namespace):
+        with self._lock:
+            return [k for (ns, k) in list(self._data) if ns == namespace and self._live((ns, k))]
+
+
+class SQLiteStore(BaseStore):
+    """SQLite-backed store; point every replica at the same file on a shared volume"""
+
+    # Expired rows are deleted on every Nth write of this process so unread keys do not pile up
+    SWEEP_EVERY = 256
+
+    def __init__(self, path: str):
+        self.path = path
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS kv ("
+                " namespace TEXT NOT NULL,"
+                " key TEXT NOT NULL,"
+                " value BLOB NOT NULL,"
+                " expires_at REAL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared between threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA busy_timeout = 30000")
+            self._local.conn = conn
+        return conn
+
+    def get(self, namespace, key):
+        row = self._conn().execute(
+            "SELECT value, expires_at FROM kv WHERE namespace = ? AND key = ?",
+            (namespace, key)
+        ).fetchone()
+        if row is None:
+            return None
+        if row[1] is not None and row[1] < time.time():
+            self.delete(namespace, key)
+            return None
+        return bytes(row[0])
+
+    def set(self, namespace, key, value, ttl=DEFAULT_TTL):
+        expires_at = time.time() + ttl if ttl else None
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO kv (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (namespace, key, sqlite3.Binary(value), expires_at)
+            )
+        with self._writes_lock:
+            self._writes += 1
+            sweep = self._writes % self.SWEEP_EVERY == 0
+        if sweep:
+            self._sweep()
+
+    def _sweep(self):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM kv WHERE expires_at < ?", (time.time(),))
+
+    def add(self, namespace, key, value, ttl=DEFAULT_TTL):
+        expires_at = time.time() + ttl if ttl else None
+        with self._conn() as conn:
+            conn.execute(
+                "DELETE FROM kv WHERE namespace = ? AND key = ? AND expires_at < ?",
+                (namespace, key, time.time())
+            )
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO kv (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (namespace, key, sqlite3.Binary(value), expires_at)
+            )
+            return cursor.rowcount == 1
+
+    def delete(self, namespace, key):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM kv WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def keys(self, namespace):
+        rows = self._conn().execute(
+            "SELECT key FROM kv WHERE namespace = ? AND (expires_at IS NULL OR expires_at >= ?)",
+            (namespace, time.time())
+        ).fetchall()
+        return [row[0] for row in rows]
+
+
+class RedisStore(BaseStore):
+    """Redis-backed store (requires the optional ``redis`` package)"""
+
+    def __init__(self, url: str, prefix: str = "transcriber"):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("SHARED_STORE_URL points at Redis but the 'redis' package is not installed") from e
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def _key(self, namespace: str, key: str) -> str:
+        return f"{self.prefix}:{namespace}:{key}"
+
+    def get(self, namespace, key):
+        return self.client.get(self._key(namespace, key))
+
+    def set(self, namespace, key, value, ttl=DEFAULT_TTL):
+        self.client.set(self._key(namespace, key), value, ex=ttl or None)
+
+    def add(self, namespace, key, value, ttl=DEFAULT_TTL):
+        return bool(self.client.set(self._key(namespace, key), value, ex=ttl or None, nx=True))
+
+    def delete(self, namespace, key):
+        self.client.delete(self._key(namespace, key))
+
+    def keys(self, namespace):
+        start = len(self._key(namespace, ""))
+        return [k.decode("utf-8")[start:] for k in self.client.scan_iter(match=self._key(namespace, "*"))]
+
+
+def create_store(url: Optional[str]) -> BaseStore:
+    """Create a store from a URL (see module docstring for supported schemes)"""
+    if not url or url.startswith("memory://"):
+        return MemoryStore()
+    if url.startswith("sqlite:///"):
+        return SQLiteStore(url[len("sqlite:///"):])
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisStore(url)
+    raise ValueError(f"Unsupported SHARED_STORE_URL: {url}")
+
+
+_store: Optional[BaseStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> BaseStore:
+    """Return the process-wide store configured by SHARED_STORE_URL"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            url = os.getenv("SHARED_STORE_URL")
+            _store = create_store(url)
+            logger.info(f"Using {type(_store).__name__} for shared state")
+        return _store
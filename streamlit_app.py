@@ -1,56 +1,52 @@
 import streamlit as st
-import requests
 import time
 import json
-import io
 from datetime import datetime
 import logging
 from pathlib import Path
 from typing import Dict, Optional
 import pandas as pd
 import plotly.express as px
-import plotly.graph_objects as go
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
-from docx import Document
-from mutagen import File as MutagenFile
 import numpy as np
-import subprocess
 import os
+import hashlib
+import re
+import tempfile
+import uuid
+import backend_client
+from audio_info import UPLOAD_FIELDS, audio_fields, probe_audio_file, upload_fields
+from exporters import export_full_report_to_pdf, export_summary_to_pdf, export_to_word
+from job_queue import BackendSlots, Job, JobQueue, QueueFullError, QUEUED, COMPLETED, CANCELLED, FINISHED_STATES
+from result_cache import ResultManager, build_result, record_run
+from shared_store import MemoryStore, get_store
+from summarizer import summarize_transcript
+from log_config import configure_logging
+from profiling import RerunProfile, hot_function_rows, profile_rerun, profiled, timer_rows
 
-# Setup logging
-log_dir = Path("logs")
-log_dir.mkdir(exist_ok=True)
+# Setup logging (once per process; reruns reuse the background writer)
+configure_logging("logs/frontend.log")
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('logs/frontend.log'),
-        logging.StreamHandler()
-    ]
-)
-
-logger = logging.getLogger("streamlit")
+logger = logging.getLogger("frontend")
 
 # Initialize session state
-if 'transcription' not in st.session_state:
-    st.session_state.transcription = None
-if 'summary' not in st.session_state:
-    st.session_state.summary = None
-if 'processing_time' not in st.session_state:
-    st.session_state.processing_time = None
+# Results are held by the process-wide ResultManager; sessions keep only the id
+if 'result_id' not in st.session_state:
+    st.session_state.result_id = None
 if 'file_info' not in st.session_state:
     st.session_state.file_info = None
 if 'dark_mode' not in st.session_state:
     st.session_state.dark_mode = False
 if 'processing_stage' not in st.session_state:
     st.session_state.processing_stage = None
+if 'file_hash' not in st.session_state:
+    st.session_state.file_hash = None
+if 'upload_id' not in st.session_state:
+    st.session_state.upload_id = None
+if 'job_id' not in st.session_state:
+    st.session_state.job_id = None
 
 # Custom CSS for modern design
+@profiled
 def load_css():
     """Load custom CSS for modern design with theme support"""
     # Base styles
@@ -239,109 +235,119 @@ def load_css():
 
 def get_file_info(uploaded_file) -> Dict:
     """Extract comprehensive file information"""
+    # Save file temporarily to analyze with mutagen (unique path, sessions may share /tmp)
+    suffix = Path(uploaded_file.name).suffix
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as f:
+        f.write(uploaded_file.getvalue())
+        temp_path = f.name
     try:
-        # Save file temporarily to analyze with mutagen
-        temp_path = f"/tmp/{uploaded_file.name}"
-        with open(temp_path, "wb") as f:
-            f.write(uploaded_file.getvalue())
-        
-        # Get audio metadata using mutagen
-        audio_file = MutagenFile(temp_path)
-        duration = 0
-        bitrate = 0
-        
-        if audio_file is not None and hasattr(audio_file, 'info'):
-            # Handle different audio formats
-            info = audio_file.info
-            
-            # Get duration
-            if hasattr(info, 'length'):
-                duration = info.length
-            elif hasattr(info, 'duration'):
-                duration = info.duration
-            
-            # Get bitrate
-            if hasattr(info, 'bitrate'):
-                bitrate = info.bitrate
-            elif hasattr(info, 'total_bitrate'):
-                bitrate = info.total_bitrate
-            
-            # For MP4/M4A files, try alternative methods
-            if duration == 0 and uploaded_file.name.lower().endswith(('.m4a', '.mp4', '.aac')):
-                try:
-                    from mutagen.mp4 import MP4
-                    mp4_file = MP4(temp_path)
-                    if mp4_file.info:
-                        duration = mp4_file.info.length
-                        bitrate = mp4_file.info.bitrate
-                except:
-                    pass
-        
-        # If still no duration, try ffprobe as fallback
-        if duration == 0:
-            try:
-                # Try using ffprobe to get accurate metadata
-                result = subprocess.run([
-                    'ffprobe', '-v', 'quiet', '-show_entries', 
-                    'format=duration,bit_rate', '-of', 'csv=p=0', temp_path
-                ], capture_output=True, text=True, timeout=30)
-                
-                if result.returncode == 0:
-                    lines = result.stdout.strip().split('\n')
-                    if len(lines) > 0:
-                        parts = lines[0].split(',')
-                        if len(parts) >= 1 and parts[0]:
-                            duration = float(parts[0])
-                        if len(parts) >= 2 and parts[1]:
-                            bitrate = float(parts[1])
-                        logger.info(f"Successfully extracted metadata using ffprobe for {uploaded_file.name}")
-            except Exception as ffprobe_error:
-                logger.warning(f"ffprobe failed: {ffprobe_error}")
-        
-        # If still no duration, estimate based on file size and typical bitrates
-        if duration == 0:
-            file_size_mb = len(uploaded_file.getvalue()) / (1024 * 1024)
-            # Estimate duration based on typical audio bitrates (128-320 kbps average)
-            estimated_bitrate = 192  # kbps average
-            duration = (file_size_mb * 8 * 1024) / estimated_bitrate  # Convert MB to seconds
-            bitrate = estimated_bitrate * 1000  # Convert to bps
-            logger.warning(f"Could not extract metadata for {uploaded_file.name}, using size-based estimates")
-        
-        file_size = len(uploaded_file.getvalue())
-        
-        return {
-            "name": uploaded_file.name,
-            "size_bytes": file_size,
-            "size_mb": file_size / (1024 * 1024),
-            "duration_seconds": duration,
-            "duration_minutes": duration / 60 if duration > 0 else 0,
-            "bitrate_kbps": bitrate // 1000 if bitrate > 0 else 0,
-            "format": uploaded_file.name.split('.')[-1].upper(),
-            "estimated_words": int(duration * 2.5) if duration > 0 else 0,  # ~150 words per minute / 60 seconds
-            "upload_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-        
-    except Exception as e:
-        logger.error(f"Error getting file info: {e}")
-        
-        # Fallback with size-based estimation
-        file_size = len(uploaded_file.getvalue())
-        file_size_mb = file_size / (1024 * 1024)
-        
-        # Rough estimation for audio files based on typical compression
-        estimated_duration = (file_size_mb * 8 * 1024) / 192  # 192 kbps average
-        
-        return {
-            "name": uploaded_file.name,
-            "size_bytes": file_size,
-            "size_mb": file_size_mb,
-            "duration_seconds": estimated_duration,
-            "duration_minutes": estimated_duration / 60,
-            "bitrate_kbps": 192,  # Estimated average
-            "format": uploaded_file.name.split('.')[-1].upper(),
-            "estimated_words": int(estimated_duration * 2.5),
-            "upload_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
+        return probe_audio_file(temp_path, uploaded_file.name, len(uploaded_file.getvalue()))
+    finally:
+        os.unlink(temp_path)
+
+def compute_file_hash(uploaded_file) -> str:
+    """Content hash used as the shared key for file info, results and exports"""
+    return hashlib.sha256(uploaded_file.getvalue()).hexdigest()
+
+def upload_key(uploaded_file) -> str:
+    """Identity of the file currently held by the uploader"""
+    return getattr(uploaded_file, "file_id", None) or f"{uploaded_file.name}:{uploaded_file.size}"
+
+def load_file_info(uploaded_file, file_hash: str) -> Dict:
+    """Get file info for this upload, probing the audio only on a shared-store miss.
+
+    Only the content-derived fields are shared by hash; name and upload time stay per session.
+    """
+    store = get_store()
+    audio = store.get_json("file_info", file_hash)
+    if audio is None:
+        file_info = get_file_info(uploaded_file)
+        store.set_json("file_info", file_hash, audio_fields(file_info))
+        return file_info
+    return {**audio, **upload_fields(uploaded_file.name)}
+
+@st.cache_resource
+def get_result_manager() -> ResultManager:
+    """Process-wide result cache; backed by the shared store when one is configured"""
+    store = get_store()
+    return ResultManager(
+        max_bytes=int(os.getenv("RESULT_CACHE_MB", "256")) * 1024 * 1024,
+        spill_dir=os.getenv("RESULT_SPILL_DIR", "/tmp/result_spill"),
+        # A process-local store would keep every result in memory again
+        store=None if isinstance(store, MemoryStore) else store
+    )
+
+def current_result() -> Optional[Dict]:
+    """Result referenced by this session's handle, loaded from cache, disk or store"""
+    if not st.session_state.result_id:
+        return None
+    return get_result_manager().get(st.session_state.result_id)
+
+def source_hash(result_id: str) -> str:
+    """Content hash of the audio a result was produced from"""
+    return result_id.split(".", 1)[0]
+
+def regenerated_result_id(result_id: str, instructions: str) -> str:
+    """Result id of a summary regenerated with custom instructions.
+
+    Keyed by audio hash and instructions, so it never replaces the shared result
+    other users of the same file get.
+    """
+    digest = hashlib.sha256(instructions.encode("utf-8")).hexdigest()[:16]
+    return f"{source_hash(result_id)}.{digest}"
+
+def load_result(result_id: str) -> bool:
+    """Point this session at a stored result; returns False if it is unknown"""
+    if not get_result_manager().get(result_id):
+        return False
+    st.session_state.result_id = result_id
+    if source_hash(result_id) != st.session_state.file_hash:
+        # The uploader's hash and info describe another file now; recompute them on the next use
+        st.session_state.file_hash = None
+        st.session_state.upload_id = None
+    return True
+
+def result_file_info() -> Dict:
+    """File info of the shown result: this session's upload if it is the same audio, else the shared audio fields"""
+    file_hash = source_hash(st.session_state.result_id)
+    if st.session_state.file_info and st.session_state.file_hash == file_hash:
+        return st.session_state.file_info
+    return audio_fields(get_store().get_json("file_info", file_hash) or {})
+
+def save_result(result_id: str, data: Dict, duration_seconds: float = 0) -> Dict:
+    """Persist a backend response so any session (or replica) can serve it"""
+    result = build_result(data, duration_seconds)
+    get_result_manager().put(result_id, result)
+    return result
+
+EXPORT_KINDS = ("summary_pdf", "word", "full_pdf")
+# Exports are cheap to rebuild, so they are not kept as long as results
+EXPORT_TTL = 3600
+
+def invalidate_exports(result_id: str):
+    """Drop cached export artifacts after a result changed"""
+    store = get_store()
+    for key in store.keys("exports"):
+        if key.startswith(f"{result_id}:"):
+            store.delete("exports", key)
+
+def cached_export(kind: str, build) -> bytes:
+    """Return export bytes from the shared store, building them once per result and upload.
+
+    Reports contain the per-upload file name and time, so those are part of the key.
+    """
+    result_id = st.session_state.result_id
+    if not result_id:
+        return build()
+    file_info = result_file_info()
+    upload = json.dumps([file_info.get(field) for field in UPLOAD_FIELDS])
+    store = get_store()
+    key = f"{result_id}:{kind}:{hashlib.sha256(upload.encode('utf-8')).hexdigest()[:16]}"
+    data = store.get("exports", key)
+    if data is None:
+        data = build()
+        store.set("exports", key, data, ttl=EXPORT_TTL)
+    return data
 
 def estimate_processing_time(file_info: Dict) -> Dict:
     """Estimate processing times based on file characteristics"""
@@ -358,6 +364,7 @@ def estimate_processing_time(file_info: Dict) -> Dict:
         "total_estimate": transcription_time + summarization_time
     }
 
+@profiled
 def display_file_info_card(file_info: Dict):
     """Display file information in a modern card"""
     st.markdown("""
@@ -385,6 +392,103 @@ def display_file_info_card(file_info: Dict):
         st.metric("⏳ Est. Processing", f"{estimates.get('total_estimate', 0):.1f} min")
         st.metric("🤖 Model", "Whisper Large")
 
+@st.cache_data(show_spinner=False)
+def processing_time_frame(result_id: str, transcription_time: float, summarization_time: float) -> pd.DataFrame:
+    """Stage timings of one result, built once and reused on every rerun"""
+    return pd.DataFrame(
+        {"Time (seconds)": [transcription_time, summarization_time]},
+        index=pd.Index(["Transcription", "Summarization"], name="Stage")
+    )
+
+RUN_KEY_PATTERN = re.compile(r"^\d{13}-")
+
+@st.cache_data(ttl=30, show_spinner=False)
+def load_run_dashboard(limit: int = 500):
+    """Load the most recent runs from the shared store and aggregate them with NumPy"""
+    store = get_store()
+    # Run keys are prefixed with their finish time, so only the newest `limit` runs are fetched
+    keys = sorted(key for key in store.keys("runs") if RUN_KEY_PATTERN.match(key))[-limit:]
+    runs = [run for run in (store.get_json("runs", key) for key in keys) if run]
+    if not runs:
+        return None, {}
+
+    history = pd.DataFrame(runs).sort_values("finished_at")
+    history.index = pd.to_datetime(history["finished_at"], unit="s")
+
+    total = history["total"].to_numpy(dtype=float)
+    audio = history["duration_seconds"].to_numpy(dtype=float)
+    wait = history["queue_wait"].to_numpy(dtype=float)
+    has_audio = audio > 0
+    rtf = np.full(total.shape, np.nan)
+    rtf[has_audio] = total[has_audio] / audio[has_audio]
+    history["real_time_factor"] = rtf
+
+    # Transcript analytics were added to run records later; older runs count as missing
+    wpm = history.get("words_per_minute", pd.Series(np.nan, index=history.index)).to_numpy(dtype=float)
+    wpm[wpm <= 0] = np.nan
+    fillers = history.get("filler_rate", pd.Series(np.nan, index=history.index)).to_numpy(dtype=float)
+    words = history.get("word_count", pd.Series(0, index=history.index)).fillna(0).to_numpy(dtype=float)
+
+    p50, p95 = np.percentile(total, [50, 95])
+    aggregates = {
+        "runs": int(total.size),
+        "p50_latency": float(p50),
+        "p95_latency": float(p95),
+        "p95_queue_wait": float(np.percentile(wait, 95)),
+        "median_rtf": float(np.nanmedian(rtf)) if has_audio.any() else 0.0,
+        "audio_hours": float(audio.sum() / 3600),
+        "words_transcribed": int(words.sum()),
+        "median_wpm": float(np.nanmedian(wpm)) if np.isfinite(wpm).any() else 0.0,
+        "mean_filler_rate": float(np.nanmean(fillers)) if np.isfinite(fillers).any() else 0.0,
+    }
+    return history, aggregates
+
+def display_run_dashboard():
+    """Aggregated processing statistics across stored runs"""
+    cache = get_result_manager().metrics()
+    st.caption(
+        f"🧠 Result cache: {cache['resident_bytes'] / (1024 * 1024):.1f} / "
+        f"{cache['max_bytes'] / (1024 * 1024):.0f} MB resident in {cache['resident_entries']} results · "
+        f"{cache['spilled_entries']} spilled to disk ({cache['spilled_bytes'] / (1024 * 1024):.1f} MB) · "
+        f"{cache['hits']} memory / {cache['disk_hits']} disk / {cache['store_hits']} store hits"
+    )
+
+    history, aggregates = load_run_dashboard()
+    if history is None:
+        st.caption("No completed runs recorded yet")
+        return
+
+    col1, col2, col3, col4, col5 = st.columns(5)
+    with col1:
+        st.metric("🧾 Runs", f"{aggregates['runs']:,}")
+    with col2:
+        st.metric("⏱️ p50 Latency", f"{aggregates['p50_latency']:.1f}s")
+    with col3:
+        st.metric("🐢 p95 Latency", f"{aggregates['p95_latency']:.1f}s")
+    with col4:
+        st.metric("⚡ Median RTF", f"{aggregates['median_rtf']:.2f}")
+    with col5:
+        st.metric("🕒 p95 Queue Wait", f"{aggregates['p95_queue_wait']:.1f}s")
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("🎧 Audio Processed", f"{aggregates['audio_hours']:.1f} h")
+    with col2:
+        st.metric("📝 Words Transcribed", f"{aggregates['words_transcribed']:,}")
+    with col3:
+        st.metric("🗣️ Median WPM", f"{aggregates['median_wpm']:.0f}")
+    with col4:
+        st.metric("🤔 Avg. Filler Rate", f"{aggregates['mean_filler_rate']:.1f}%")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("**Stage Times (seconds)**")
+        st.line_chart(history[["transcription", "summarization"]], height=250)
+    with col2:
+        st.markdown("**Real-Time Factor (processing time / audio time)**")
+        st.line_chart(history[["real_time_factor"]], height=250)
+
+@profiled
 def display_processing_stats(processing_time: Dict, file_info: Dict):
     """Display processing statistics with charts"""
     st.markdown("""
@@ -396,31 +500,17 @@ def display_processing_stats(processing_time: Dict, file_info: Dict):
     col1, col2 = st.columns(2)
     
     with col1:
-        # Processing time breakdown chart
-        times = {
-            'Transcription': processing_time.get('transcription', 0),
-            'Summarization': processing_time.get('summarization', 0)
-        }
-        
-        fig = go.Figure(data=[
-            go.Bar(
-                x=list(times.keys()),
-                y=list(times.values()),
-                marker_color=['#667eea', '#764ba2'],
-                text=[f"{v:.1f}s" for v in times.values()],
-                textposition='auto',
-            )
-        ])
-        
-        fig.update_layout(
-            title="Processing Time Breakdown",
-            xaxis_title="Stage",
-            yaxis_title="Time (seconds)",
-            template="plotly_white",
+        # Processing time breakdown chart (native Vega-Lite bars, data cached per result)
+        st.markdown("**Processing Time Breakdown**")
+        st.bar_chart(
+            processing_time_frame(
+                st.session_state.result_id or "",
+                processing_time.get('transcription', 0),
+                processing_time.get('summarization', 0)
+            ),
+            color="#667eea",
             height=300
         )
-        
-        st.plotly_chart(fig, use_container_width=True)
     
     with col2:
         # Performance metrics with proper error handling
@@ -448,9 +538,10 @@ def display_processing_stats(processing_time: Dict, file_info: Dict):
         for metric, value in metrics_data.items():
             st.metric(metric, value)
 
-def create_progress_indicator(stage: str, progress: int):
+def create_progress_indicator(stage: str, progress: int, detail: Optional[str] = None):
     """Create animated progress indicator"""
     stage_info = {
+        "queued": {"emoji": "🕒", "text": "Waiting in the processing queue", "color": "#f6d365"},
         "uploading": {"emoji": "📤", "text": "Uploading audio file", "color": "#ff9a9e"},
         "transcribing": {"emoji": "🎤", "text": "Converting speech to text", "color": "#667eea"},
         "summarizing": {"emoji": "🧠", "text": "Generating intelligent summary", "color": "#764ba2"},
@@ -463,165 +554,189 @@ def create_progress_indicator(stage: str, progress: int):
     <div class="progress-card pulse">
         <h2 style="margin: 0; font-size: 3rem;">{info['emoji']}</h2>
         <h3 style="margin: 0.5rem 0; color: #333;">{info['text']}</h3>
-        <p style="margin: 0; color: #666;">Progress: {progress}%</p>
+        <p style="margin: 0; color: #666;">{detail or f"Progress: {progress}%"}</p>
     </div>
     """, unsafe_allow_html=True)
 
-def export_full_report_to_pdf(transcription: str, summary: Dict, file_info: Dict) -> bytes:
-    """Export transcription and summary to PDF"""
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
-    styles = getSampleStyleSheet()
-    story = []
-    
-    # Title
-    title = Paragraph("Audio Transcription & Summary Report", styles['Title'])
-    story.append(title)
-    story.append(Spacer(1, 12))
-    
-    # File info
-    file_info_text = f"""
-    <b>File:</b> {file_info.get('name', 'Unknown')}<br/>
-    <b>Duration:</b> {file_info.get('duration_minutes', 0):.1f} minutes<br/>
-    <b>Size:</b> {file_info.get('size_mb', 0):.1f} MB<br/>
-    <b>Processed:</b> {file_info.get('upload_time', 'Unknown')}
-    """
-    story.append(Paragraph(file_info_text, styles['Normal']))
-    story.append(Spacer(1, 20))
-    
-    # Transcription
-    story.append(Paragraph("Transcription", styles['Heading1']))
-    story.append(Paragraph(transcription, styles['Normal']))
-    story.append(Spacer(1, 20))
-    
-    # Summary
-    story.append(Paragraph("Summary", styles['Heading1']))
-    
-    # Check if full_text exists and use it as the primary content
-    if summary.get('full_text'):
-        # Split the full_text into paragraphs and format them properly
-        full_text_content = summary['full_text']
-        # Replace line breaks and format for PDF
-        full_text_content = full_text_content.replace('\n', '<br/>')
-        story.append(Paragraph(full_text_content, styles['Normal']))
-        story.append(Spacer(1, 20))
-    else:
-        # Fallback to structured sections if full_text is not available
-        if summary.get('overview'):
-            story.append(Paragraph(f"<b>Overview:</b> {summary['overview']}", styles['Normal']))
-            story.append(Spacer(1, 12))
-    
-        for section_name, section_data in summary.items():
-            if section_name not in ['overview', 'full_text'] and section_data:
-                story.append(Paragraph(f"<b>{section_name.replace('_', ' ').title()}:</b>", styles['Heading2']))
-                if isinstance(section_data, list):
-                    for item in section_data:
-                        story.append(Paragraph(f"• {item}", styles['Normal']))
-                else:
-                    story.append(Paragraph(str(section_data), styles['Normal']))
-                story.append(Spacer(1, 12))
-    
-    doc.build(story)
-    buffer.seek(0)
-    return buffer.getvalue()
-
-def export_summary_to_pdf(summary: Dict, file_info: Dict) -> bytes:
-    """Export only summary to PDF"""
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
-    styles = getSampleStyleSheet()
-    story = []
-    
-    # Title
-    title = Paragraph("Audio Summary Report", styles['Title'])
-    story.append(title)
-    story.append(Spacer(1, 12))
-    
-    # File info
-    file_info_text = f"""
-    <b>File:</b> {file_info.get('name', 'Unknown')}<br/>
-    <b>Duration:</b> {file_info.get('duration_minutes', 0):.1f} minutes<br/>
-    <b>Size:</b> {file_info.get('size_mb', 0):.1f} MB<br/>
-    <b>Processed:</b> {file_info.get('upload_time', 'Unknown')}
-    """
-    story.append(Paragraph(file_info_text, styles['Normal']))
-    story.append(Spacer(1, 20))
-    
-    # Summary Content - Include full_text if available
-    story.append(Paragraph("Summary", styles['Heading1']))
-    
-    # Check if full_text exists and use it as the primary content
-    if summary.get('full_text'):
-        # Split the full_text into paragraphs and format them properly
-        full_text_content = summary['full_text']
-        # Replace line breaks and format for PDF
-        full_text_content = full_text_content.replace('\n', '<br/>')
-        story.append(Paragraph(full_text_content, styles['Normal']))
-        story.append(Spacer(1, 20))
+STAGE_PROGRESS = {"queued": 5, "uploading": 10, "transcribing": 30, "summarizing": 80, "completed": 100}
+
+def get_user_id() -> str:
+    """Identity used for fair scheduling: a proxy-supplied user header, else the browser session"""
+    context = getattr(st, "context", None)
+    if context is not None:
+        for header in ("X-Forwarded-User", "X-Forwarded-Email", "X-Auth-Request-User"):
+            value = context.headers.get(header)
+            if value:
+                return value
+    if 'user_id' not in st.session_state:
+        st.session_state.user_id = f"session-{uuid.uuid4().hex[:12]}"
+    return st.session_state.user_id
+
+def run_transcription_job(job: Job) -> Dict:
+    """Process a queued job on a worker thread and persist its result"""
+    # Another session or replica may have finished the same file while this job was waiting
+    stored = get_result_manager().get(job.file_hash)
+    if stored:
+        logger.info(f"Job {job.job_id} reused stored result for {job.file_hash}",
+                    extra={"job_id": job.job_id, "file_hash": job.file_hash, "stage": "reuse"})
+        return stored
+
+    def on_upload_progress(sent: int, total: int):
+        job.stage = "uploading"
+        job.progress = sent / total if total else 1.0
+        if sent >= total:
+            job.stage = "transcribing"
+
+    job.stage = "uploading"
+    data = backend_client.transcribe(job.filename, job.data, job_id=job.job_id,
+                                     cancel_event=job.cancel_event,
+                                     file_hash=job.file_hash,
+                                     on_upload_progress=on_upload_progress)
+    result = save_result(job.file_hash, data, job.duration_seconds)
+    record_run(job.job_id, job.duration_seconds, (job.started_at or job.submitted_at) - job.submitted_at, result)
+    return result
+
+@st.cache_resource
+def get_job_queue() -> JobQueue:
+    """Process-wide job queue shared by all sessions of this replica"""
+    return JobQueue(
+        run_transcription_job,
+        max_concurrency=int(os.getenv("MAX_CONCURRENT_JOBS", "2")),
+        max_queue_length=int(os.getenv("MAX_QUEUE_LENGTH", "50")),
+        max_queued_per_user=int(os.getenv("MAX_QUEUED_JOBS_PER_USER", "3")),
+        abandon_timeout=float(os.getenv("JOB_ABANDON_TIMEOUT", "60")),
+        fairness_window=float(os.getenv("JOB_FAIRNESS_WINDOW", "900")),
+        # Shared with other replicas and the watch-folder service through the store
+        slots=BackendSlots(get_store(), int(os.getenv("MAX_CONCURRENT_JOBS", "2")))
+    )
+
+def session_connected() -> bool:
+    """False once the browser behind the current script run has disconnected"""
+    try:
+        from streamlit.runtime import get_instance
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+        return ctx is None or get_instance().is_active_session(ctx.session_id)
+    except Exception:
+        return True
+
+def track_job(job_id: str):
+    """Show queue position and stage of a job until it finishes, then load its result"""
+    queue = get_job_queue()
+    if st.button("⏹️ Cancel Processing", key="cancel_job"):
+        queue.cancel(job_id)
+    progress_container = st.empty()
+
+    while True:
+        job = queue.get(job_id)
+        if job is None or job.status in FINISHED_STATES:
+            break
+        if not session_connected():
+            # Stop heartbeating; the reaper cancels the job if nobody reattaches within JOB_ABANDON_TIMEOUT
+            return
+        queue.heartbeat(job_id)
+        with progress_container.container():
+            if job.status == QUEUED:
+                stats = queue.stats()
+                create_progress_indicator(
+                    "queued", STAGE_PROGRESS["queued"],
+                    detail=f"Position {queue.position(job_id)} of {stats['queued']} · "
+                           f"{stats['running']}/{stats['max_concurrency']} jobs running"
+                )
+            elif job.stage == "uploading":
+                progress = STAGE_PROGRESS["uploading"] + int(
+                    job.progress * (STAGE_PROGRESS["transcribing"] - STAGE_PROGRESS["uploading"]))
+                create_progress_indicator("uploading", progress, detail=f"Uploaded {job.progress:.0%}")
+            else:
+                create_progress_indicator(job.stage, STAGE_PROGRESS.get(job.stage, 30))
+        time.sleep(1)
+
+    progress_container.empty()
+    st.session_state.job_id = None
+    if "job" in st.query_params:
+        del st.query_params["job"]
+
+    if job is None:
+        st.warning("The processing job is no longer available, please start it again")
+    elif job.status == COMPLETED:
+        load_result(job.file_hash)
+        st.query_params["result"] = job.file_hash
+        st.rerun()
+    elif job.status == CANCELLED:
+        st.info("⏹️ Processing cancelled")
     else:
-        # Fallback to structured sections if full_text is not available
-        if summary.get('overview'):
-            story.append(Paragraph(f"<b>Overview:</b> {summary['overview']}", styles['Normal']))
-            story.append(Spacer(1, 12))
-        
-        for section_name, section_data in summary.items():
-            if section_name not in ['overview', 'full_text'] and section_data:
-                story.append(Paragraph(f"<b>{section_name.replace('_', ' ').title()}:</b>", styles['Heading2']))
-                if isinstance(section_data, list):
-                    for item in section_data:
-                        story.append(Paragraph(f"• {item}", styles['Normal']))
-                else:
-                    story.append(Paragraph(str(section_data), styles['Normal']))
-                story.append(Spacer(1, 12))
-    
-    doc.build(story)
-    buffer.seek(0)
-    return buffer.getvalue()
-
-def export_to_word(transcription: str, summary: Dict, file_info: Dict) -> bytes:
-    """Export transcription and summary to Word document"""
-    doc = Document()
-    
-    # Title
-    title = doc.add_heading('Audio Transcription & Summary Report', 0)
-    
-    # File info
-    doc.add_heading('File Information', level=1)
-    file_info_para = doc.add_paragraph()
-    file_info_para.add_run(f"File: ").bold = True
-    file_info_para.add_run(f"{file_info.get('name', 'Unknown')}\n")
-    file_info_para.add_run(f"Duration: ").bold = True
-    file_info_para.add_run(f"{file_info.get('duration_minutes', 0):.1f} minutes\n")
-    file_info_para.add_run(f"Size: ").bold = True
-    file_info_para.add_run(f"{file_info.get('size_mb', 0):.1f} MB\n")
-    file_info_para.add_run(f"Processed: ").bold = True
-    file_info_para.add_run(f"{file_info.get('upload_time', 'Unknown')}")
-    
-    # Transcription
-    doc.add_heading('Transcription', level=1)
-    doc.add_paragraph(transcription)
-    
-    # Summary
-    doc.add_heading('Summary', level=1)
-    if summary.get('overview'):
-        overview_para = doc.add_paragraph()
-        overview_para.add_run('Overview: ').bold = True
-        overview_para.add_run(summary['overview'])
-    
-    for section_name, section_data in summary.items():
-        if section_name not in ['overview', 'full_text'] and section_data:
-            doc.add_heading(section_name.replace('_', ' ').title(), level=2)
-            if isinstance(section_data, list):
-                for item in section_data:
-                    doc.add_paragraph(f"• {item}")
+        error = (job.error or "Unknown error").replace("\n", "<br/>")
+        st.markdown(f"""
+        <div class="status-error">
+            ❌ Processing Error: {error}
+        </div>
+        """, unsafe_allow_html=True)
+
+@profiled
+def display_transcript_analytics(analytics: Dict):
+    """Keywords, filler words and speaking rate from the stored analytics"""
+    with st.expander("🔎 Transcript Analytics"):
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("🧩 Unique Words", f"{analytics['unique_words']:,}")
+        with col2:
+            st.metric("✍️ Sentences", f"{analytics['sentence_count']:,}")
+        with col3:
+            st.metric("📏 Avg. Word Length", f"{analytics['avg_word_length']:.1f}")
+        with col4:
+            st.metric("🤔 Filler Rate", f"{analytics['filler_rate']:.1f}%")
+
+        col1, col2 = st.columns(2)
+        with col1:
+            if analytics["top_keywords"]:
+                st.markdown("**Top Keywords**")
+                st.bar_chart(pd.Series(analytics["top_keywords"], name="Mentions"), horizontal=True, height=300)
+        with col2:
+            if analytics["filler_words"]:
+                st.markdown(f"**Filler Words** ({analytics['filler_total']:,} total)")
+                st.dataframe(
+                    pd.DataFrame(list(analytics["filler_words"].items()), columns=["Filler", "Count"]),
+                    hide_index=True,
+                    use_container_width=True
+                )
+
+        if analytics["speaking_rate"]:
+            st.markdown("**Speaking Rate per Segment (words per minute)**")
+            st.line_chart(pd.DataFrame(analytics["speaking_rate"]).set_index("start"), height=250)
+
+def display_regenerate_summary():
+    """Re-summarize the stored transcript with optional custom instructions"""
+    with st.expander("🔄 Regenerate Summary"):
+        instructions = st.text_area(
+            "Instructions",
+            placeholder="e.g. Focus on decisions and owners, write for an executive audience",
+            help="Chunk summaries are cached, so only the final combine step is repeated"
+        )
+        if st.button("🧠 Regenerate", key="regenerate_summary"):
+            try:
+                with st.spinner("Summarizing transcript..."):
+                    started = time.time()
+                    result = current_result()
+                    summary = summarize_transcript(result["transcription"], instructions or None)
+                result_id = regenerated_result_id(st.session_state.result_id, instructions)
+                save_result(result_id, {
+                    **result,
+                    "summary": summary,
+                    "processing_time": {
+                        **(result.get("processing_time") or {}),
+                        "summarization": time.time() - started
+                    },
+                })
+                invalidate_exports(result_id)
+                load_result(result_id)
+                st.query_params["result"] = result_id
+            except Exception as e:
+                st.error(f"Summarization failed: {e}")
+                logger.error(f"Summarization error: {e}")
             else:
-                doc.add_paragraph(str(section_data))
-    
-    buffer = io.BytesIO()
-    doc.save(buffer)
-    buffer.seek(0)
-    return buffer.getvalue()
+                st.rerun()
 
+@profiled
 def display_summary(summary: Dict):
     """Display the structured summary with modern styling"""
     if not summary:
@@ -640,10 +755,10 @@ def display_summary(summary: Dict):
         with col1:
             if st.button("📄 Export Summary PDF", key="export_summary_pdf"):
                 try:
-                    pdf_data = export_summary_to_pdf(
+                    pdf_data = cached_export("summary_pdf", lambda: export_summary_to_pdf(
                         summary,
-                        st.session_state.file_info or {}
-                    )
+                        result_file_info()
+                    ))
                     st.download_button(
                         "⬇️ Download Summary PDF",
                         data=pdf_data,
@@ -656,11 +771,11 @@ def display_summary(summary: Dict):
         with col2:
             if st.button("📝 Export Word", key="export_word"):
                 try:
-                    word_data = export_to_word(
-                        st.session_state.transcription or "",
+                    word_data = cached_export("word", lambda: export_to_word(
+                        (current_result() or {}).get("transcription", ""),
                         summary,
-                        st.session_state.file_info or {}
-                    )
+                        result_file_info()
+                    ))
                     st.download_button(
                         "⬇️ Download Word",
                         data=word_data,
@@ -771,6 +886,21 @@ def main():
     
     st.markdown("<br>", unsafe_allow_html=True)
 
+    # Reattach to a job started before a reload; jobs live in this replica's queue only
+    job_param = st.query_params.get("job")
+    if job_param and st.session_state.job_id is None:
+        job = get_job_queue().get(job_param)
+        if job is not None and job.status not in FINISHED_STATES:
+            st.session_state.job_id = job_param
+        else:
+            del st.query_params["job"]
+
+    # Restore results after a reload; any replica can serve them from the shared store
+    result_param = st.query_params.get("result")
+    if result_param and st.session_state.result_id != result_param:
+        if not load_result(result_param):
+            del st.query_params["result"]
+
     # File upload section
     uploaded_file = st.file_uploader(
         "📁 Choose an audio file", 
@@ -779,95 +909,59 @@ def main():
     )
 
     if uploaded_file:
-        # Get and store file information
-        if st.session_state.file_info is None:
-            st.session_state.file_info = get_file_info(uploaded_file)
+        # Get and store file information, again whenever the uploader holds a different file
+        upload_id = upload_key(uploaded_file)
+        if st.session_state.upload_id != upload_id or st.session_state.file_hash is None:
+            st.session_state.upload_id = upload_id
+            st.session_state.file_hash = compute_file_hash(uploaded_file)
+            st.session_state.file_info = load_file_info(uploaded_file, st.session_state.file_hash)
         
         # Display file information
         display_file_info_card(st.session_state.file_info)
         
         # Processing button
-        if st.button("🚀 Start Processing", type="primary"):
+        if st.session_state.job_id is None and st.button("🚀 Start Processing", type="primary"):
+            # Reuse a result another session or replica already produced for this file
+            if load_result(st.session_state.file_hash):
+                logger.info(f"Reusing stored result for {st.session_state.file_hash}")
+                st.query_params["result"] = st.session_state.file_hash
+                st.rerun()
+
             try:
-                start_time = time.time()
-                logger.info("Starting audio processing")
-                
-                # Initialize progress tracking
-                progress_container = st.empty()
-                status_container = st.empty()
-
-                # Stage 1: Uploading
-                with progress_container.container():
-                    create_progress_indicator("uploading", 10)
-                
-                files = {"file": uploaded_file}
-                
-                # Stage 2: API Request
-                with progress_container.container():
-                    create_progress_indicator("transcribing", 30)
-                
-                response = requests.post(
-                    "http://app:8000/transcribe",
-                    files=files,
-                    timeout=7200
+                job = get_job_queue().submit(
+                    user_id=get_user_id(),
+                    filename=uploaded_file.name,
+                    data=uploaded_file.getvalue(),
+                    file_hash=st.session_state.file_hash,
+                    duration_seconds=st.session_state.file_info.get("duration_seconds", 0)
                 )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    
-                    # Stage 3: Summarizing
-                    with progress_container.container():
-                        create_progress_indicator("summarizing", 80)
-                    
-                    # Store results
-                    st.session_state.transcription = data.get("transcription", "")
-                    st.session_state.summary = data.get("summary", {})
-                    st.session_state.processing_time = data.get("processing_time", {})
-                    
-                    # Stage 4: Completed
-                    with progress_container.container():
-                        create_progress_indicator("completed", 100)
-                    
-                    time.sleep(1)  # Show completion briefly
-                    progress_container.empty()
-                    
-                    st.markdown("""
-                    <div class="status-success fade-in">
-                        ✅ Processing completed successfully!
-                    </div>
-                    """, unsafe_allow_html=True)
-                    
-                    st.rerun()
-                    
-                else:
-                    progress_container.empty()
-                    st.markdown(f"""
-                    <div class="status-error">
-                        ❌ API Error: {response.status_code}<br/>
-                        {response.text}
-                    </div>
-                    """, unsafe_allow_html=True)
-                    
-            except Exception as e:
-                progress_container.empty()
+                st.session_state.job_id = job.job_id
+                # Lets a reload (e.g. after a network drop) reattach to the running job
+                st.query_params["job"] = job.job_id
+            except QueueFullError as e:
                 st.markdown(f"""
                 <div class="status-error">
-                    ❌ Processing Error: {str(e)}
+                    ❌ {str(e)}
                 </div>
                 """, unsafe_allow_html=True)
-                logger.error(f"Processing error: {e}")
+
+    # Follow the active job; this also resumes tracking after any rerun
+    if st.session_state.job_id:
+        track_job(st.session_state.job_id)
 
     # Display results if available
-    if (hasattr(st.session_state, 'transcription') and 
-        st.session_state.transcription and 
-        hasattr(st.session_state, 'summary') and 
-        st.session_state.summary):
+    result = current_result()
+    file_info = result_file_info() if result else {}
+    if result and result.get("transcription") and "analytics" not in result:
+        # Results stored before analytics existed get them computed once here
+        result = save_result(st.session_state.result_id, result, file_info.get("duration_seconds", 0))
+    if result and result.get("transcription") and result.get("summary"):
         
         st.markdown("<br><br>", unsafe_allow_html=True)
         
         # Processing statistics
-        if st.session_state.processing_time and st.session_state.file_info:
-            display_processing_stats(st.session_state.processing_time, st.session_state.file_info)
+        if result.get("processing_time") and file_info:
+            display_processing_stats(result["processing_time"], file_info)
         
         # Results tabs
         tab1, tab2 = st.tabs(["📝 Transcription", "📋 Summary"])
@@ -879,28 +973,25 @@ def main():
             </div>
             """, unsafe_allow_html=True)
             
-            # Transcription statistics
-            word_count = len(st.session_state.transcription.split())
-            char_count = len(st.session_state.transcription)
+            # Transcription statistics (precomputed once per transcript)
+            analytics = result["analytics"]
             
             col1, col2, col3, col4 = st.columns(4)
             with col1:
-                st.metric("📊 Word Count", f"{word_count:,}")
+                st.metric("📊 Word Count", f"{analytics['word_count']:,}")
             with col2:
-                st.metric("🔤 Character Count", f"{char_count:,}")
+                st.metric("🔤 Character Count", f"{analytics['char_count']:,}")
             with col3:
-                if st.session_state.file_info:
-                    duration = st.session_state.file_info.get('duration_minutes', 1)
-                    wpm = word_count / duration if duration > 0 else 0
-                    st.metric("⚡ Words per Minute", f"{wpm:.0f}")
+                if analytics["words_per_minute"] > 0:
+                    st.metric("⚡ Words per Minute", f"{analytics['words_per_minute']:.0f}")
             with col4:
                 if st.button("📄 Export Full Report PDF", key="export_full_pdf"):
                     try:
-                        pdf_data = export_full_report_to_pdf(
-                            st.session_state.transcription,
-                            st.session_state.summary or {},
-                            st.session_state.file_info or {}
-                        )
+                        pdf_data = cached_export("full_pdf", lambda: export_full_report_to_pdf(
+                            result["transcription"],
+                            result["summary"] or {},
+                            file_info
+                        ))
                         st.download_button(
                             "⬇️ Download Full Report PDF",
                             data=pdf_data,
@@ -914,23 +1005,52 @@ def main():
             if st.button("📥 Download Transcription TXT", key="download_transcription"):
                 st.download_button(
                     "⬇️ Download as TXT",
-                    data=st.session_state.transcription,
+                    data=result["transcription"],
                     file_name=f"transcription_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt",
                     mime="text/plain"
                 )
             
+            display_transcript_analytics(analytics)
+
             st.text_area(
                 "Full Transcription", 
-                st.session_state.transcription, 
+                result["transcription"], 
                 height=400,
                 help="Click and drag to select text for copying"
             )
             
         with tab2:
-            if st.session_state.summary:
-                display_summary(st.session_state.summary)
+            display_regenerate_summary()
+            if result["summary"]:
+                display_summary(result["summary"])
             else:
                 st.warning("No summary available")
 
+    with st.expander("📈 Throughput Dashboard"):
+        display_run_dashboard()
+
+def profiling_enabled() -> bool:
+    """Profiling is opt-in via PROFILE_RERUNS=1, or ?profile=1 where PROFILE_ALLOW_QUERY=1 permits it"""
+    if os.getenv("PROFILE_RERUNS") == "1":
+        return True
+    return os.getenv("PROFILE_ALLOW_QUERY") == "1" and st.query_params.get("profile") == "1"
+
+def display_profile_panel(profile: RerunProfile):
+    """Debug panel with the timings of the rerun that just finished"""
+    with st.expander(f"🛠️ Profiling · rerun took {profile.wall_time * 1000:.0f} ms", expanded=True):
+        timers = timer_rows(profile)
+        if timers:
+            st.markdown("**Instrumented functions (wall clock)**")
+            st.dataframe(pd.DataFrame(timers), hide_index=True, use_container_width=True)
+        hot = hot_function_rows(profile)
+        if hot:
+            st.markdown("**Hot functions (cProfile, by cumulative time)**")
+            st.dataframe(pd.DataFrame(hot), hide_index=True, use_container_width=True)
+        if profile.dump_path:
+            st.caption(f"Full profile written to `{profile.dump_path}` (open with `snakeviz` or `python -m pstats`)")
+
 if __name__ == "__main__":
-    main()
+    with profile_rerun(profiling_enabled()) as rerun_profile:
+        main()
+    if rerun_profile is not None:
+        display_profile_panel(rerun_profile)
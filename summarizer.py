@@ -0,0 +1,141 @@
+"""Map-reduce summarization of stored transcripts through an OpenAI-compatible endpoint.
+
+Long transcripts are split into chunks that are summarized concurrently (map),
+then combined into the structured summary the app displays (reduce). Chunk
+summaries are cached in the shared store by chunk content and position, model
+and map prompt, so regenerating with different instructions only repeats the reduce step.
+
+Configuration: ``OPENAI_API_KEY``, ``OPENAI_BASE_URL`` (e.g. a local stand-in),
+``SUMMARY_MODEL``, ``SUMMARY_CHUNK_CHARS`` and ``SUMMARY_MAX_CONCURRENCY``.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from typing import Dict, List, Optional
+
+from langchain_openai import ChatOpenAI
+
+try:
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+except ImportError:  # older langchain releases
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+from shared_store import get_store
+
+logger = logging.getLogger("frontend")
+
+SUMMARY_MODEL = os.getenv("SUMMARY_MODEL", "gpt-4o-mini")
+SUMMARY_CHUNK_CHARS = int(os.getenv("SUMMARY_CHUNK_CHARS", "6000"))
+SUMMARY_MAX_CONCURRENCY = int(os.getenv("SUMMARY_MAX_CONCURRENCY", "4"))
+
+LIST_SECTIONS = [
+    "main_points",
+    "key_insights",
+    "action_items_decisions",
+    "open_questions_next_steps",
+    "conclusions",
+]
+
+MAP_PROMPT = """You are summarizing part {index} of {total} of a transcript.
+Write concise bullet points covering the facts, arguments, decisions, action items
+and open questions in this part. Do not add anything that is not in the text.
+
+Transcript part:
+{chunk}"""
+
+DEFAULT_INSTRUCTIONS = "Write a clear, neutral summary for someone who did not attend."
+
+REDUCE_PROMPT = """Below are summaries of consecutive parts of one transcript.
+{instructions}
+
+Combine them into a single summary and answer with a JSON object only, using these keys:
+- "overview": a short paragraph
+- "main_points", "key_insights", "action_items_decisions",
+  "open_questions_next_steps", "conclusions": lists of short strings (may be empty)
+- "full_text": the complete summary as readable prose
+
+Part summaries:
+{summaries}"""
+
+# Bump when MAP_PROMPT changes so stale chunk summaries are not reused
+MAP_PROMPT_VERSION = "1"
+
+
+def _llm() -> ChatOpenAI:
+    return ChatOpenAI(
+        model=SUMMARY_MODEL,
+        temperature=0,
+        base_url=os.getenv("OPENAI_BASE_URL") or None
+    )
+
+
+def split_transcript(transcription: str) -> List[str]:
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=SUMMARY_CHUNK_CHARS,
+        chunk_overlap=200,
+        separators=["\n\n", "\n", ". ", " ", ""]
+    )
+    return splitter.split_text(transcription)
+
+
+def _chunk_key(chunk: str, index: int, total: int) -> str:
+    # index and total are part of MAP_PROMPT, so they are part of the key
+    return hashlib.sha256(
+        f"{MAP_PROMPT_VERSION}:{SUMMARY_MODEL}:{index}/{total}:{chunk}".encode("utf-8")
+    ).hexdigest()
+
+
+def summarize_chunks(chunks: List[str]) -> List[str]:
+    """Map step: summarize chunks concurrently, reusing cached chunk summaries"""
+    store = get_store()
+    keys = [_chunk_key(chunk, i + 1, len(chunks)) for i, chunk in enumerate(chunks)]
+    summaries = [store.get("chunk_summaries", key) for key in keys]
+    missing = [i for i, summary in enumerate(summaries) if summary is None]
+
+    if missing:
+        started = time.time()
+        prompts = [MAP_PROMPT.format(index=i + 1, total=len(chunks), chunk=chunks[i]) for i in missing]
+        responses = _llm().batch(prompts, config={"max_concurrency": SUMMARY_MAX_CONCURRENCY})
+        for i, response in zip(missing, responses):
+            summaries[i] = response.content.encode("utf-8")
+            store.set("chunk_summaries", keys[i], summaries[i])
+        logger.info(f"Summarized {len(missing)}/{len(chunks)} chunks in {time.time() - started:.1f}s")
+
+    return [summary.decode("utf-8") for summary in summaries]
+
+
+def _parse_summary(text: str) -> Dict:
+    """Parse the reduce output into the app's summary structure"""
+    match = re.search(r"\{.*\}", text, re.DOTALL)
+    try:
+        data = json.loads(match.group(0)) if match else {}
+    except ValueError:
+        data = {}
+    if not data:
+        logger.warning("Reduce step did not return JSON, using the raw text as summary")
+        return {"overview": "", **{section: [] for section in LIST_SECTIONS}, "full_text": text.strip()}
+
+    summary = {"overview": str(data.get("overview", "")).strip()}
+    for section in LIST_SECTIONS:
+        items = data.get(section) or []
+        summary[section] = [str(item).strip() for item in (items if isinstance(items, list) else [items])]
+    summary["full_text"] = str(data.get("full_text", "")).strip()
+    return summary
+
+
+def reduce_summaries(chunk_summaries: List[str], instructions: Optional[str] = None) -> Dict:
+    """Reduce step: combine chunk summaries into the structured summary"""
+    joined = "\n\n".join(f"Part {i}:\n{summary}" for i, summary in enumerate(chunk_summaries, 1))
+    prompt = REDUCE_PROMPT.format(instructions=instructions or DEFAULT_INSTRUCTIONS, summaries=joined)
+    return _parse_summary(_llm().invoke(prompt).content)
+
+
+def summarize_transcript(transcription: str, instructions: Optional[str] = None) -> Dict:
+    """Summarize a stored transcript without re-transcribing the audio"""
+    chunks = split_transcript(transcription)
+    if not chunks:
+        return {}
+    return reduce_summaries(summarize_chunks(chunks), instructions)
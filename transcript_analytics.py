@@ -0,0 +1,104 @@
+"""One-time analytics pass over a transcript, stored alongside the result.
+
+All counting is done on a pandas Series of tokens (value_counts / isin /
+vectorized string ops), so the cost is one pass over the text regardless of
+how often the results page is rendered.
+"""
+import re
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Han and kana are written without spaces: each character counts as one word, as word processors count them.
+# Other scripts use Unicode word characters, so accented and non-Latin words stay whole.
+_CJK = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff"
+TOKEN_PATTERN = re.compile(rf"[{_CJK}]|[^\W{_CJK}]+(?:'[^\W{_CJK}]+)?")
+SENTENCE_PATTERN = re.compile(r"[.!?]+(?:\s|$)|[。！？]+")
+
+FILLER_WORDS = ["um", "uh", "erm", "ah", "hmm", "like", "basically", "actually", "literally", "so"]
+FILLER_PHRASES = ["you know", "i mean", "kind of", "sort of"]
+
+STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have
+having he her here hers herself him himself his how i if in into is it its itself just let me more
+most my myself no nor not now of off on once only or other our ours ourselves out over own really
+same she should so some such than that the their theirs them themselves then there these they this
+those through to too under until up very was we were what when where which while who whom why will
+with would you your yours yourself yourselves yeah okay ok oh going get got gonna want one also well
+think know right thing things lot
+""".split())
+
+TOP_KEYWORDS = 15
+MAX_RATE_POINTS = 200
+
+
+def _speaking_rate(segments: List[Dict]) -> pd.DataFrame:
+    """Words per minute for each timestamped segment (Whisper-style start/end/text)"""
+    frame = pd.DataFrame(segments, columns=["start", "end", "text"]).dropna(subset=["start", "end"])
+    frame["text"] = frame["text"].fillna("").astype(str)
+    seconds = (frame["end"] - frame["start"]).to_numpy(dtype=float)
+    # Same tokenization as the transcript-level counts, so segment rates add up to word_count
+    words = frame["text"].str.count(TOKEN_PATTERN).to_numpy(dtype=float)
+    wpm = np.divide(words * 60, seconds, out=np.zeros_like(words), where=seconds > 0)
+    return pd.DataFrame({
+        "start": frame["start"].to_numpy(dtype=float),
+        "end": frame["end"].to_numpy(dtype=float),
+        "words": words,
+        "wpm": wpm,
+    })
+
+
+def compute_analytics(transcription: str, segments: Optional[List[Dict]] = None,
+                      duration_seconds: float = 0) -> Dict:
+    """Token counts, speaking rate, keywords and filler usage of one transcript (JSON-serializable)"""
+    tokens = pd.Series(TOKEN_PATTERN.findall(transcription.lower()), dtype=object)
+    word_count = int(tokens.size)
+    counts = tokens.value_counts()
+
+    # Speaking rate: measured per segment when the backend returned timestamps,
+    # otherwise only the overall rate from the probed audio duration
+    rate_points = []
+    if segments:
+        rate = _speaking_rate(segments)
+        if not rate.empty:
+            # Timestamps are exact, the probed duration may be a size-based estimate
+            duration_seconds = float(rate["end"].max()) or duration_seconds
+            step = max(1, len(rate) // MAX_RATE_POINTS)
+            rate_points = rate.iloc[::step][["start", "wpm"]].round(1).to_dict("records")
+    minutes = duration_seconds / 60
+    words_per_minute = word_count / minutes if minutes > 0 else 0.0
+
+    # Fillers: single words straight from the counts, phrases from a vectorized bigram series
+    filler_counts = counts.reindex(FILLER_WORDS, fill_value=0)
+    if word_count > 1:
+        # Only build bigrams where the first word can start a filler phrase
+        first = tokens.iloc[:-1].reset_index(drop=True)
+        second = tokens.iloc[1:].reset_index(drop=True)
+        candidates = first.isin({phrase.split()[0] for phrase in FILLER_PHRASES})
+        bigrams = first[candidates] + " " + second[candidates]
+        phrase_counts = bigrams[bigrams.isin(FILLER_PHRASES)].value_counts()
+        filler_counts = pd.concat([filler_counts, phrase_counts.reindex(FILLER_PHRASES, fill_value=0)])
+    filler_counts = filler_counts[filler_counts > 0].sort_values(ascending=False)
+    filler_total = int(filler_counts.sum())
+
+    keywords = counts[
+        ~counts.index.isin(STOPWORDS) & ~counts.index.isin(FILLER_WORDS) & (counts.index.str.len() > 2)
+        & ~counts.index.str.isdigit()
+    ].head(TOP_KEYWORDS)
+
+    return {
+        "word_count": word_count,
+        "char_count": len(transcription),
+        "unique_words": int(counts.size),
+        "sentence_count": len(SENTENCE_PATTERN.findall(transcription)),
+        "avg_word_length": float(tokens.str.len().mean()) if word_count else 0.0,
+        "duration_seconds": float(duration_seconds),
+        "words_per_minute": float(words_per_minute),
+        "speaking_rate": rate_points,
+        "top_keywords": {str(word): int(n) for word, n in keywords.items()},
+        "filler_words": {str(word): int(n) for word, n in filler_counts.items()},
+        "filler_total": filler_total,
+        "filler_rate": filler_total / word_count * 100 if word_count else 0.0,
+    }
@@ -0,0 +1,259 @@
+"""Watch-folder ingestion service.
+
+Usage:
+    python watch_folder.py /srv/recordings/inbox --output /srv/recordings/processed
+
+New audio files in the watched directory are picked up once their size and
+modification time have been stable for ``--settle`` seconds (recorders write
+files incrementally), probed for metadata and then pipelined through
+upload/transcription and export. Each stage has its own bounded worker pool, so
+exporting one recording overlaps with transcribing the next, and at most
+``--max-in-flight`` files are held in memory at once.
+
+Results are written to ``<output>/<name>-<hash>/``. With a shared store
+(``SHARED_STORE_URL``) they are also saved there, so they can be opened in the
+web app with ``?result=<hash>``, runs show up in its throughput dashboard, and
+backend requests count against the same ``MAX_CONCURRENT_JOBS`` cap as the
+web app's job queue.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
+
+import backend_client
+from audio_info import audio_fields, probe_audio_file, upload_fields
+from exporters import export_full_report_to_pdf, write_word_report
+from job_queue import BackendSlots
+from log_config import configure_logging
+from result_cache import ResultManager, build_result, record_run
+from shared_store import MemoryStore, get_store
+
+logger = logging.getLogger("watch_folder")
+
+AUDIO_EXTENSIONS = {".mp3", ".wav", ".m4a", ".flac", ".ogg"}
+
+
+class _AudioEventHandler(FileSystemEventHandler):
+    """Forward file-system events for audio files to the ingestor"""
+
+    def __init__(self, ingestor: "WatchFolderIngestor"):
+        self.ingestor = ingestor
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.ingestor.touch(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.ingestor.touch(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self.ingestor.touch(event.dest_path)
+
+
+class WatchFolderIngestor:
+    """Debounce new audio files and pipeline them through probe, transcription and export"""
+
+    def __init__(self, watch_dir: str, output_dir: str, settle_seconds: float = 10,
+                 transcribe_concurrency: int = 2, export_concurrency: int = 2,
+                 max_in_flight: int = 4, backend_slots: Optional[BackendSlots] = None,
+                 results: Optional[ResultManager] = None):
+        self.watch_dir = Path(watch_dir)
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.settle_seconds = settle_seconds
+
+        # path -> ((size, mtime), time the signature was first seen)
+        self._pending: Dict[str, Tuple[Optional[Tuple[int, float]], float]] = {}
+        self._in_flight = set()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._backend_slots = backend_slots
+        # Shared with the web app; None when there is no shared store to publish results to
+        self._results = results
+
+        self._probe_pool = ThreadPoolExecutor(2, thread_name_prefix="probe")
+        self._transcribe_pool = ThreadPoolExecutor(transcribe_concurrency, thread_name_prefix="transcribe")
+        self._export_pool = ThreadPoolExecutor(export_concurrency, thread_name_prefix="export")
+
+    def touch(self, path: str):
+        """Note a new or changed file; it is processed once it stops changing"""
+        if Path(path).suffix.lower() not in AUDIO_EXTENSIONS:
+            return
+        with self._lock:
+            if path not in self._in_flight:
+                self._pending[path] = (None, time.time())
+
+    def scan_existing(self):
+        """Queue files that were dropped while the service was not running"""
+        for path in sorted(self.watch_dir.iterdir()):
+            if path.is_file():
+                self.touch(str(path))
+
+    def poll(self):
+        """Dispatch pending files whose size and mtime have been stable long enough"""
+        now = time.time()
+        with self._lock:
+            candidates = list(self._pending.items())
+
+        for path, (signature, since) in candidates:
+            try:
+                stat = Path(path).stat()
+            except FileNotFoundError:
+                with self._lock:
+                    self._pending.pop(path, None)
+                continue
+
+            current = (stat.st_size, stat.st_mtime)
+            if current != signature:
+                with self._lock:
+                    self._pending[path] = (current, now)
+                continue
+            if now - since < self.settle_seconds or stat.st_size == 0:
+                continue
+            if not self._slots.acquire(blocking=False):
+                break  # pipeline is full, retry on the next poll
+
+            with self._lock:
+                self._pending.pop(path, None)
+                self._in_flight.add(path)
+            self._probe_pool.submit(self._probe, path)
+
+    def _release(self, path: str):
+        with self._lock:
+            self._in_flight.discard(path)
+        self._slots.release()
+
+    def _output_path(self, path: str, file_hash: str) -> Path:
+        return self.output_dir / f"{Path(path).stem}-{file_hash[:12]}"
+
+    def _probe(self, path: str):
+        try:
+            data = Path(path).read_bytes()
+            file_hash = hashlib.sha256(data).hexdigest()
+            if (self._output_path(path, file_hash) / "result.json").exists():
+                logger.info(f"Skipping {path}: already processed")
+                self._release(path)
+                return
+
+            store = get_store()
+            audio = store.get_json("file_info", file_hash)
+            if audio is None:
+                file_info = probe_audio_file(path, Path(path).name, len(data))
+                store.set_json("file_info", file_hash, audio_fields(file_info))
+            else:
+                file_info = {**audio, **upload_fields(Path(path).name)}
+            logger.info(f"Probed {path}: {file_info['duration_minutes']:.1f} min, {file_info['size_mb']:.1f} MB")
+            self._transcribe_pool.submit(self._transcribe, path, data, file_hash, file_info)
+        except Exception as e:
+            logger.error(f"Probing {path} failed: {e}")
+            self._release(path)
+
+    def _transcribe(self, path: str, data: bytes, file_hash: str, file_info: Dict):
+        try:
+            result = self._results.get(file_hash) if self._results else None
+            if result is None:
+                job_id = uuid.uuid4().hex
+                queued_at = time.time()
+                with self._backend_slots.hold() if self._backend_slots else nullcontext():
+                    started = time.time()
+                    response = backend_client.transcribe(Path(path).name, data, job_id=job_id, file_hash=file_hash)
+                result = build_result(response, file_info.get("duration_seconds", 0))
+                if self._results:
+                    self._results.put(file_hash, result)
+                    record_run(job_id, file_info.get("duration_seconds", 0), started - queued_at, result)
+                elapsed = time.time() - started
+                logger.info(f"Transcribed {path} in {elapsed:.1f}s",
+                            extra={"file_hash": file_hash, "stage": "transcribe", "duration": elapsed})
+            self._export_pool.submit(self._export, path, file_hash, file_info, result)
+        except Exception as e:
+            logger.error(f"Transcribing {path} failed: {e}")
+            self._release(path)
+
+    def _export(self, path: str, file_hash: str, file_info: Dict, result: Dict):
+        try:
+            target = self._output_path(path, file_hash)
+            target.mkdir(parents=True, exist_ok=True)
+            transcription = result.get("transcription", "")
+            summary = result.get("summary", {}) or {}
+
+            (target / "transcription.txt").write_text(transcription, encoding="utf-8")
+            (target / "report.pdf").write_bytes(export_full_report_to_pdf(transcription, summary, file_info))
+            with open(target / "report.docx", "wb") as f:
+                write_word_report(f, transcription, summary, file_info)
+            # Written last: its presence marks the file as fully processed
+            (target / "result.json").write_text(
+                json.dumps({"file_hash": file_hash, "file_info": file_info, **result}, indent=2),
+                encoding="utf-8"
+            )
+            logger.info(f"Exported {path} to {target}")
+        except Exception as e:
+            logger.error(f"Exporting {path} failed: {e}")
+        finally:
+            self._release(path)
+
+    def run(self, poll_interval: float = 1.0):
+        """Watch the directory until interrupted"""
+        observer = Observer()
+        observer.schedule(_AudioEventHandler(self), str(self.watch_dir), recursive=False)
+        observer.start()
+        self.scan_existing()
+        logger.info(f"Watching {self.watch_dir} for audio files")
+        try:
+            while True:
+                self.poll()
+                time.sleep(poll_interval)
+        except KeyboardInterrupt:
+            logger.info("Stopping watch-folder service")
+        finally:
+            observer.stop()
+            observer.join()
+            for pool in (self._probe_pool, self._transcribe_pool, self._export_pool):
+                pool.shutdown(wait=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transcribe audio files dropped into a folder")
+    parser.add_argument("watch_dir", help="Directory to watch for new recordings")
+    parser.add_argument("--output", default="processed", help="Directory for transcripts and reports")
+    parser.add_argument("--settle", type=float, default=10,
+                        help="Seconds a file must stay unchanged before it is processed")
+    parser.add_argument("--concurrency", type=int, default=2, help="Concurrent backend transcriptions")
+    parser.add_argument("--max-in-flight", type=int, default=4, help="Files held in the pipeline at once")
+    args = parser.parse_args()
+
+    configure_logging("logs/watch_folder.log")
+    store = get_store()
+    results = None
+    if isinstance(store, MemoryStore):
+        logger.warning("SHARED_STORE_URL is not set: results are only written to the output folder, "
+                       "cannot be opened in the web app and do not count against its concurrency cap")
+    else:
+        # The store is the source of truth; keep only the newest result in this process
+        results = ResultManager(max_bytes=0, store=store)
+    WatchFolderIngestor(
+        args.watch_dir,
+        args.output,
+        settle_seconds=args.settle,
+        transcribe_concurrency=args.concurrency,
+        max_in_flight=max(args.max_in_flight, args.concurrency),
+        backend_slots=BackendSlots(store, int(os.getenv("MAX_CONCURRENT_JOBS", "2"))),
+        results=results
+    ).run()
+
+
+if __name__ == "__main__":
+    main()